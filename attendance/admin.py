@@ -4,9 +4,10 @@
 from django.contrib import admin
 
 # Register your models here.
-from .models import Profile, Class, Attend, Appeal
+from .models import Profile, Section, Class, Attend, Appeal
 
 admin.site.register(Profile)
+admin.site.register(Section)
 admin.site.register(Class)
 admin.site.register(Attend)
 admin.site.register(Appeal)
@@ -0,0 +1,57 @@
+# attendance/appeals.py
+# approve or reject many attendance appeals at once
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/29/2025
+
+from django.db import transaction
+from .models import Appeal, Attend, refresh_rollups, rollups_enabled
+
+
+def adjudicate_appeals(appeal_ids, approve):
+    """
+    Approve or reject the submitted appeals among appeal_ids in one
+    transaction and return how many were decided. Approving marks the
+    student attended, updating a sign-in they already have for the session.
+    """
+    with transaction.atomic():
+        appeals = list(
+            Appeal.objects.filter(pk__in=appeal_ids, status="submitted")
+            .select_related("session")
+            .order_by("pk")
+        )
+        if not appeals:
+            return 0
+
+        if approve:
+            # one row per student and session, even if they appealed twice
+            attends = {
+                (appeal.student_id, appeal.session_id): Attend(
+                    student_id=appeal.student_id,
+                    session=appeal.session,
+                    answer=appeal.session.answer,
+                    latitude=appeal.session.latitude,
+                    longitude=appeal.session.longitude,
+                    status="attended",
+                )
+                for appeal in appeals
+            }
+            Attend.objects.bulk_create(
+                list(attends.values()),
+                update_conflicts=True,
+                unique_fields=["student", "session"],
+                update_fields=[
+                    "answer",
+                    "latitude",
+                    "longitude",
+                    "status",
+                    "timestamp",
+                ],
+            )
+            # bulk_create sends no post_save signals
+            if rollups_enabled():
+                refresh_rollups({appeal.student_id for appeal in appeals})
+
+        for appeal in appeals:
+            appeal.status = "approved" if approve else "rejected"
+        Appeal.objects.bulk_update(appeals, ["status"])
+
+    return len(appeals)
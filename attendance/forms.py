@@ -3,23 +3,24 @@
 # Author: Yihang Duanmu (harrydm@bu.edu), 12/2/2025
 
 from django import forms
+from datetime import date
 from .models import *
+from .schedule import parse_days
+
+
+def section_choices(kind=None):
+    """Return (name, label) choices for the registered sections of kind"""
+    return [
+        (name, section.label)
+        for name, section in get_sections().items()
+        if kind is None or section.kind == kind
+    ]
 
 
 class CreateClassForm(forms.ModelForm):
     """A form to add a Class to the database"""
 
-    class_name = forms.ChoiceField(
-        choices=[
-            ("CS 412 A1", "CS412 A1 - Lecture 9:30"),
-            ("CS 412 B1", "CS412 B2 - Lecture 11:00"),
-            ("CS 412 C1", "CS412 C1 - Discussion 12:20"),
-            ("CS 412 C2", "CS412 C2 - Discussion 13:25"),
-            ("CS 412 C3", "CS412 C3 - Discussion 14:30"),
-            ("Test - CS 412 A1", "Test choice - Create session A1 starting right now"),
-        ],
-        label="Class Name",
-    )
+    class_name = forms.ChoiceField(choices=section_choices, label="Class Name")
 
     # Dropdown for answer (1 to 10)
     answer = forms.ChoiceField(
@@ -70,17 +71,82 @@ class CreateProfileForm(forms.ModelForm):
                     "size": 30,
                 }
             ),
-            "lecture": forms.Select(
-                choices=[
-                    ("CS 412 A1", "CS 412 A1"),
-                    ("CS 412 B1", "CS 412 B1"),
-                ]
-            ),
-            "discussion": forms.Select(
-                choices=[
-                    ("CS 412 C1", "CS 412 C1"),
-                    ("CS 412 C2", "CS 412 C2"),
-                    ("CS 412 C3", "CS 412 C3"),
-                ]
-            ),
+            "lecture": forms.Select(),
+            "discussion": forms.Select(),
         }
+
+    def __init__(self, *args, **kwargs):
+        """Offer the registered lecture and discussion sections"""
+        super().__init__(*args, **kwargs)
+        for field in ["lecture", "discussion"]:
+            self.fields[field].widget.choices = [
+                (name, name) for name, label in section_choices(field)
+            ]
+
+
+class GenerateScheduleForm(forms.Form):
+    """A form to generate a term of Class sessions from weekly rules"""
+
+    start_date = forms.DateField(
+        label="First day of classes", widget=forms.DateInput(attrs={"type": "date"})
+    )
+    end_date = forms.DateField(
+        label="Last day of classes", widget=forms.DateInput(attrs={"type": "date"})
+    )
+    skip_dates = forms.CharField(
+        required=False,
+        label="Holidays to skip",
+        help_text="One date (YYYY-MM-DD) per line or separated by commas",
+        widget=forms.Textarea(attrs={"rows": 3}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        """Add a days field for every section with a fixed start time"""
+        super().__init__(*args, **kwargs)
+        self.sections = [
+            section
+            for section in get_sections().values()
+            if section.start_time is not None
+        ]
+        for section in self.sections:
+            self.fields[f"days_{section.pk}"] = forms.CharField(
+                required=False,
+                label=f"{section.label} meets on",
+                help_text="e.g. MWF or TR, blank for none",
+                widget=forms.TextInput(attrs={"size": 8}),
+            )
+
+    def section_fields(self):
+        """Return the bound days fields, one per section"""
+        return [self[f"days_{section.pk}"] for section in self.sections]
+
+    def clean(self):
+        """Check the term dates and turn the days and holidays into rules"""
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("start_date"), cleaned_data.get("end_date")
+        if start and end and end < start:
+            self.add_error("end_date", "The term must end after it starts.")
+
+        rules = []
+        for section in self.sections:
+            field = f"days_{section.pk}"
+            try:
+                weekdays = parse_days(cleaned_data.get(field, ""))
+            except ValueError as e:
+                self.add_error(field, str(e))
+                continue
+            if weekdays:
+                rules.append((section, weekdays))
+        if not rules and not self.errors:
+            raise forms.ValidationError("Give the days of at least one section.")
+        cleaned_data["rules"] = rules
+
+        skip = []
+        for value in cleaned_data.get("skip_dates", "").replace(",", " ").split():
+            try:
+                skip.append(date.fromisoformat(value))
+            except ValueError:
+                self.add_error("skip_dates", f"{value} is not a YYYY-MM-DD date.")
+        cleaned_data["skip"] = skip
+
+        return cleaned_data
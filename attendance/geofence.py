@@ -0,0 +1,57 @@
+# attendance/geofence.py
+# distance and containment checks for classroom locations
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/27/2025
+
+import math
+
+EARTH_RADIUS_M = 6_371_000
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Return the great-circle distance in meters between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def project(lat, lng, origin_lat, origin_lng):
+    """
+    Return (x, y) in meters of a point relative to an origin on a local flat
+    projection, accurate over the size of a campus.
+    """
+    x = math.radians(lng - origin_lng) * math.cos(math.radians(origin_lat))
+    y = math.radians(lat - origin_lat)
+    return x * EARTH_RADIUS_M, y * EARTH_RADIUS_M
+
+
+def point_in_polygon(lat, lng, polygon):
+    """Return True if the point is inside polygon, a list of [lat, lng] vertices"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i]
+        lat_j, lng_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            crossing = lng_i + (lat - lat_i) / (lat_j - lat_i) * (lng_j - lng_i)
+            if lng < crossing:
+                inside = not inside
+        j = i
+    return inside
+
+
+def distance_to_polygon(lat, lng, polygon):
+    """Return the distance in meters from the point to the nearest polygon edge"""
+    points = [project(v_lat, v_lng, lat, lng) for v_lat, v_lng in polygon]
+    nearest = math.inf
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        dx, dy = x2 - x1, y2 - y1
+        length = dx * dx + dy * dy
+        # closest point of the edge to the origin, which is the point itself
+        t = 0 if length == 0 else max(0, min(1, -(x1 * dx + y1 * dy) / length))
+        nearest = min(nearest, math.hypot(x1 + t * dx, y1 + t * dy))
+    return nearest
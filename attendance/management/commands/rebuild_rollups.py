@@ -0,0 +1,18 @@
+# attendance/management/commands/rebuild_rollups.py
+# management command to recompute the attendance participation rollups
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/30/2025
+
+from django.core.management.base import BaseCommand
+from attendance.models import ParticipationRollup, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the ParticipationRollup table from the Class and Attend tables."
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. Rebuilt {ParticipationRollup.objects.count()} rollups"
+            )
+        )
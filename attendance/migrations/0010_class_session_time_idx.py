@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2025-12-24 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0009_attend_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="class",
+            index=models.Index(fields=["session_time"], name="class_session_time_idx"),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2025-12-26 09:35
+
+from django.db import migrations, models
+
+
+def remove_duplicate_attends(apps, schema_editor):
+    """
+    Keep one Attend per student and session before adding the constraint:
+    an attended record if there is one, otherwise the earliest.
+    """
+    Attend = apps.get_model("attendance", "Attend")
+    duplicates = []
+    previous = None
+    attends = Attend.objects.order_by(
+        "student_id",
+        "session_id",
+        models.Case(models.When(status="attended", then=0), default=1),
+        "pk",
+    ).values_list("pk", "student_id", "session_id")
+    for pk, student_id, session_id in attends:
+        if (student_id, session_id) == previous:
+            duplicates.append(pk)
+        previous = (student_id, session_id)
+    Attend.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0010_class_session_time_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attends, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="attend",
+            constraint=models.UniqueConstraint(
+                fields=("student", "session"), name="attend_unique_student_session"
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.6 on 2025-12-27 14:05
+
+from datetime import time
+from django.db import migrations, models
+
+# the sections previously hardcoded in CreateClassView
+SECTIONS = [
+    ("CS 412 A1", "CS412 A1 - Lecture 9:30", "lecture", time(9, 30), 42.350, -71.103),
+    ("CS 412 B1", "CS412 B2 - Lecture 11:00", "lecture", time(11, 0), 42.350, -71.103),
+    (
+        "CS 412 C1",
+        "CS412 C1 - Discussion 12:20",
+        "discussion",
+        time(12, 20),
+        42.349,
+        -71.104,
+    ),
+    (
+        "CS 412 C2",
+        "CS412 C2 - Discussion 13:25",
+        "discussion",
+        time(13, 25),
+        42.349,
+        -71.104,
+    ),
+    (
+        "CS 412 C3",
+        "CS412 C3 - Discussion 14:30",
+        "discussion",
+        time(14, 30),
+        42.350,
+        -71.105,
+    ),
+    (
+        "Test - CS 412 A1",
+        "Test choice - Create session A1 starting right now",
+        "test",
+        None,
+        42.350,
+        -71.103,
+    ),
+]
+
+
+def add_sections(apps, schema_editor):
+    """Register the existing course sections"""
+    Section = apps.get_model("attendance", "Section")
+    for name, label, kind, start_time, latitude, longitude in SECTIONS:
+        Section.objects.create(
+            name=name,
+            label=label,
+            kind=kind,
+            start_time=start_time,
+            latitude=latitude,
+            longitude=longitude,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0011_attend_unique_student_session"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Section",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("label", models.TextField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("lecture", "Lecture"),
+                            ("discussion", "Discussion"),
+                            ("test", "Test"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("start_time", models.TimeField(blank=True, null=True)),
+                ("latitude", models.FloatField()),
+                ("longitude", models.FloatField()),
+                ("radius", models.FloatField(default=50, help_text="meters")),
+                ("polygon", models.JSONField(blank=True, default=list)),
+                ("drift", models.FloatField(default=300, help_text="meters")),
+            ],
+        ),
+        migrations.RunPython(add_sections, migrations.RunPython.noop),
+    ]
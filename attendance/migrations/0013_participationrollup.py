@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2025-12-30 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("attendance", "0012_section"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParticipationRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("section", models.CharField(max_length=50)),
+                ("sessions_held", models.IntegerField(default=0)),
+                ("sessions_attended", models.IntegerField(default=0)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="attendance.profile",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("student", "section"),
+                        name="rollup_unique_student_section",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,17 +1,179 @@
 # attendance/models.py
 # models for the attendance application
 # Author: Yihang Duanmu (harrydm@bu.edu), 11/25/2025
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Q
+from datetime import datetime, timedelta
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User  # for authentication
+from cs412.versions import bump_version, get_version
+from .geofence import distance_to_polygon, haversine, point_in_polygon
+
+# sessions can be signed in to this long before and after they start
+ACTIVE_WINDOW = timedelta(minutes=15)
+CLASSES_VERSION_KEY = "attendance:classes_version"
+SECTIONS_VERSION_KEY = "attendance:sections_version"
+
+# (version, {name: Section}) loaded by get_sections() in this process
+_sections = None
+
+
+def rollups_enabled():
+    """Return True if participation is kept in the ParticipationRollup table"""
+    return getattr(settings, "ATTENDANCE_ROLLUPS", False)
+
+
+def get_classes_version():
+    """Return a token that changes whenever a Class is created, changed or deleted"""
+    return get_version(CLASSES_VERSION_KEY)
+
+
+def bump_classes_version():
+    """Mark the cached active sessions as stale"""
+    bump_version(CLASSES_VERSION_KEY)
+
+
+def active_sessions(now=None):
+    """
+    Return the Class sessions within ACTIVE_WINDOW of now, ordered by pk.
+    The sessions near each minute are read with one indexed range query and
+    cached for that minute, so a sign-in rush shares a single lookup.
+    """
+    now = now or timezone.now()
+    minute = int(now.timestamp() // 60)
+    key = f"attendance:active_sessions:{get_classes_version()}:{minute}"
+
+    sessions = cache.get(key)
+    if sessions is None:
+        start = now.replace(second=0, microsecond=0)
+        sessions = list(
+            Class.objects.filter(
+                session_time__gte=start - ACTIVE_WINDOW,
+                session_time__lte=start + timedelta(minutes=1) + ACTIVE_WINDOW,
+            ).order_by("pk")
+        )
+        cache.set(key, sessions, 2 * 60)
+
+    return [
+        session
+        for session in sessions
+        if now - ACTIVE_WINDOW <= session.session_time <= now + ACTIVE_WINDOW
+    ]
+
+
+def get_sections_version():
+    """Return a token that changes whenever a Section is created, changed or deleted"""
+    return get_version(SECTIONS_VERSION_KEY)
+
+
+def bump_sections_version():
+    """Make every process reload its sections"""
+    bump_version(SECTIONS_VERSION_KEY)
+
+
+def get_sections():
+    """
+    Return a dict of every Section by name, in the order they were added.
+    The sections are kept in this process and only reloaded after one changes.
+    """
+    global _sections
+    version = get_sections_version()
+    if _sections is None or _sections[0] != version:
+        sections = {section.name: section for section in Section.objects.order_by("pk")}
+        _sections = (version, sections)
+    return _sections[1]
+
+
+def get_section(name):
+    """Return the Section called name, or None"""
+    return get_sections().get(name)
+
+
+def test_section_names():
+    """Return the names of the test sections every student can sign in to"""
+    return [name for name, section in get_sections().items() if section.kind == "test"]
+
+
+def participation_rate(attended, held):
+    """Return attended out of held sessions as a percentage rounded to 2 places"""
+    if held > 0:
+        return round((attended / held) * 100, 2)
+    return 0.0
+
+
+def session_counts():
+    """Return a dict of the number of Class sessions held under each name"""
+    return dict(
+        Class.objects.order_by().values_list("name").annotate(count=Count("id"))
+    )
+
+
+class ProfileQuerySet(models.QuerySet):
+    """QuerySet of profiles with helpers for participation reports"""
+
+    def with_participation(self):
+        """
+        Return these profiles annotated with lecture_attended and
+        discussion_attended, the number of their sessions marked attended.
+        With ATTENDANCE_ROLLUPS on they are read from the rollup rows,
+        otherwise counted from the Attend table.
+        """
+        if not rollups_enabled():
+            return self.with_attended_counts()
+
+        def rollup(section):
+            rows = ParticipationRollup.objects.filter(
+                student=OuterRef("pk"), section=OuterRef(section)
+            ).values("sessions_attended")
+            return Coalesce(Subquery(rows[:1]), 0)
+
+        return self.annotate(
+            lecture_attended=rollup("lecture"),
+            discussion_attended=rollup("discussion"),
+        )
+
+    def with_attended_counts(self):
+        """
+        Return these profiles annotated with lecture_attended and
+        discussion_attended counted from the Attend table for every profile
+        in a single grouped query.
+        """
+        attended = Q(attend_profile__status="attended")
+        return self.annotate(
+            lecture_attended=Count(
+                "attend_profile",
+                filter=attended & Q(attend_profile__session__name=F("lecture")),
+            ),
+            discussion_attended=Count(
+                "attend_profile",
+                filter=attended & Q(attend_profile__session__name=F("discussion")),
+            ),
+        )
+
+
+class AtomicSaveMixin:
+    """
+    Save inside a transaction while rollups are on, so the ParticipationRollup
+    updates made by the post_save handlers in signals.py commit with the row.
+    Deletes already send post_delete inside the transaction of the delete.
+    """
+
+    def save(self, *args, **kwargs):
+        if not rollups_enabled():
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            return super().save(*args, **kwargs)
 
 
 # Create your models here.
-class Profile(models.Model):
+class Profile(AtomicSaveMixin, models.Model):
     """Encapsulate the data of a user profile of the app"""
 
+    objects = ProfileQuerySet.as_manager()
+
     # define the data attributes of the Profile object
     first_name = models.TextField(blank=False)
     last_name = models.TextField(blank=False)
@@ -27,42 +189,70 @@ class Profile(models.Model):
         status = "Instructor" if self.is_instructor else "Student"
         return f"{status} {self.first_name} {self.last_name}"
 
+    def set_participation(self, sessions):
+        """
+        Set lecture_participation, discussion_participation and
+        total_participation from the with_participation() annotations and
+        the session_counts() dict, without any queries.
+        """
+        lecture_held = sessions.get(self.lecture, 0)
+        discussion_held = sessions.get(self.discussion, 0)
+        attended = self.lecture_attended + self.discussion_attended
+        held = lecture_held + discussion_held
+        if self.lecture == self.discussion:
+            # the same sessions would otherwise be counted twice
+            attended, held = self.lecture_attended, lecture_held
+
+        self.lecture_participation = participation_rate(
+            self.lecture_attended, lecture_held
+        )
+        self.discussion_participation = participation_rate(
+            self.discussion_attended, discussion_held
+        )
+        self.total_participation = participation_rate(attended, held)
+
     def class_happening(self):
         """determine whether a class is happening within 15 minutes"""
-        now = timezone.now()
-        time_window_start = now - timedelta(minutes=15)
-        time_window_end = now + timedelta(minutes=15)
-
-        classes = Class.objects.filter(
-            session_time__gte=time_window_start, session_time__lte=time_window_end
+        session = self.get_class_happening()
+        return session is not None and session.name in (
+            self.lecture,
+            self.discussion,
+            *test_section_names(),
         )
-        if classes.exists():
-            is_my_class = (
-                classes.first().name == self.lecture
-                or classes.first().name == self.discussion
-                or classes.first().name == "Test - CS 412 A1"
-            )
-        return classes.exists() and is_my_class
 
     def get_class_happening(self):
         """get the class that's going on within 15 minutes"""
-        now = timezone.now()
-        time_window_start = now - timedelta(minutes=15)
-        time_window_end = now + timedelta(minutes=15)
-
-        classes = Class.objects.filter(
-            session_time__gte=time_window_start, session_time__lte=time_window_end
-        ).first()
-        return classes
+        sessions = active_sessions()
+        return sessions[0] if sessions else None
 
     def already_signed_in(self):
         """see if students are signed in for the class"""
-        classes = self.get_class_happening()
-        attend = Attend.objects.filter(student=self, session=classes)
-        return attend
+        session = self.get_class_happening()
+        if session is None:
+            return Attend.objects.none()
+        return Attend.objects.filter(student=self, session=session)
+
+    def get_rollups(self):
+        """Return this student's ParticipationRollups by section, read once"""
+        if not hasattr(self, "_rollups"):
+            self._rollups = {rollup.section: rollup for rollup in self.rollups.all()}
+        return self._rollups
+
+    def get_rollup_participation(self, sections):
+        """Return the percentage of sessions of sections attended, from the rollups"""
+        rollups = self.get_rollups()
+        held = attended = 0
+        for section in set(sections):
+            if section in rollups:
+                held += rollups[section].sessions_held
+                attended += rollups[section].sessions_attended
+        return participation_rate(attended, held)
 
     def get_lecture_participation(self):
         """get the percentage of lectures attended by the student"""
+        if rollups_enabled():
+            return self.get_rollup_participation([self.lecture])
+
         lectures = Class.objects.filter(name=self.lecture).count()
         participated = Attend.objects.filter(
             student=self, session__name=self.lecture, status="attended"
@@ -75,6 +265,9 @@ class Profile(models.Model):
 
     def get_discussion_participation(self):
         """get the percentage of discussion attended by the student"""
+        if rollups_enabled():
+            return self.get_rollup_participation([self.discussion])
+
         discussion = Class.objects.filter(name=self.discussion).count()
         participated = Attend.objects.filter(
             student=self, session__name=self.discussion, status="attended"
@@ -87,6 +280,9 @@ class Profile(models.Model):
 
     def get_total_participation(self):
         """get the percentage of all sessions attended by the student"""
+        if rollups_enabled():
+            return self.get_rollup_participation([self.lecture, self.discussion])
+
         total = Class.objects.filter(
             Q(name=self.lecture) | Q(name=self.discussion)
         ).count()
@@ -101,7 +297,52 @@ class Profile(models.Model):
         return 0.0
 
 
-class Class(models.Model):
+class Section(models.Model):
+    """Encapsulate the schedule and classroom location of a course section"""
+
+    KIND_CHOICES = [
+        ("lecture", "Lecture"),
+        ("discussion", "Discussion"),
+        ("test", "Test"),
+    ]
+
+    # define the data attributes of the Section object
+    name = models.CharField(max_length=50, unique=True)
+    label = models.TextField(blank=False)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # sessions of sections without a start time begin when they are created
+    start_time = models.TimeField(null=True, blank=True)
+    latitude = models.FloatField(blank=False)
+    longitude = models.FloatField(blank=False)
+    # classroom as a circle around latitude/longitude, or a polygon of
+    # [latitude, longitude] vertices when one is given
+    radius = models.FloatField(default=50, help_text="meters")
+    polygon = models.JSONField(default=list, blank=True)
+    # how far outside the classroom a GPS fix may drift, in meters
+    drift = models.FloatField(default=300, help_text="meters")
+
+    def __str__(self) -> str:
+        """return a string representation of this model instance"""
+        return self.label
+
+    def get_session_time(self, day):
+        """Return when a session of this section on day starts"""
+        if self.start_time is None:
+            return timezone.now()
+        return timezone.make_aware(datetime.combine(day, self.start_time))
+
+    def contains(self, latitude, longitude):
+        """Return True if the point is in the classroom, allowing for drift"""
+        if self.polygon:
+            return (
+                point_in_polygon(latitude, longitude, self.polygon)
+                or distance_to_polygon(latitude, longitude, self.polygon) <= self.drift
+            )
+        distance = haversine(self.latitude, self.longitude, latitude, longitude)
+        return distance <= self.radius + self.drift
+
+
+class Class(AtomicSaveMixin, models.Model):
     """Encapsulate the data of a class session"""
 
     # define the data attributes of the Class object
@@ -111,12 +352,28 @@ class Class(models.Model):
     latitude = models.FloatField(blank=False)
     longitude = models.FloatField(blank=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["session_time"], name="class_session_time_idx"),
+        ]
+
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"{self.name} at {self.session_time}"
 
+    def is_near(self, latitude, longitude):
+        """Return True if the point is inside the classroom of this session"""
+        section = get_section(self.name)
+        if section is not None:
+            return section.contains(latitude, longitude)
+        # sessions of sections no longer registered keep the fixed box
+        return (
+            abs(self.latitude - latitude) <= 0.004
+            and abs(self.longitude - longitude) <= 0.004
+        )
 
-class Attend(models.Model):
+
+class Attend(AtomicSaveMixin, models.Model):
     """Encapsulate the relationship of student attending class"""
 
     # define the data attributes of the Attend object
@@ -132,6 +389,13 @@ class Attend(models.Model):
     longitude = models.FloatField(blank=False)
     status = models.TextField(blank=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "session"], name="attend_unique_student_session"
+            ),
+        ]
+
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"Student {self.student.first_name} {self.student.last_name} attending {self.session.session_time}"
@@ -153,3 +417,86 @@ class Appeal(models.Model):
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"Student {self.student.first_name} {self.student.last_name} appealing for {self.session.session_time}"
+
+
+class ParticipationRollup(models.Model):
+    """Encapsulate the sessions held and attended by a student in a section"""
+
+    # define the data attributes of the ParticipationRollup object
+    student = models.ForeignKey(
+        Profile, related_name="rollups", on_delete=models.CASCADE
+    )
+    section = models.CharField(max_length=50)
+    sessions_held = models.IntegerField(default=0)
+    sessions_attended = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "section"], name="rollup_unique_student_section"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """return a string representation of this model instance"""
+        return f"{self.student} attended {self.sessions_attended} of {self.sessions_held} {self.section}"
+
+
+def compute_rollups(students):
+    """
+    Return unsaved ParticipationRollups for the lecture and discussion of
+    every profile in students, counted from the Class and Attend tables.
+    """
+    sessions = session_counts()
+    rollups = []
+    for student in students.with_attended_counts().iterator():
+        attended = {
+            student.discussion: student.discussion_attended,
+            student.lecture: student.lecture_attended,
+        }
+        for section, count in attended.items():
+            if section:
+                rollups.append(
+                    ParticipationRollup(
+                        student_id=student.pk,
+                        section=section,
+                        sessions_held=sessions.get(section, 0),
+                        sessions_attended=count,
+                    )
+                )
+    return rollups
+
+
+def refresh_rollups(student_ids):
+    """Recompute the ParticipationRollups of the students with student_ids"""
+    student_ids = list(student_ids)
+    with transaction.atomic():
+        ParticipationRollup.objects.filter(student_id__in=student_ids).delete()
+        ParticipationRollup.objects.bulk_create(
+            compute_rollups(Profile.objects.filter(pk__in=student_ids))
+        )
+
+
+def rebuild_rollups():
+    """Recompute every ParticipationRollup from the source tables"""
+    with transaction.atomic():
+        ParticipationRollup.objects.all().delete()
+        ParticipationRollup.objects.bulk_create(
+            compute_rollups(Profile.objects.all()), batch_size=2000
+        )
+
+
+def add_sessions_held(counts):
+    """Add to sessions_held of every student, counts being {section: delta}"""
+    for section, delta in counts.items():
+        ParticipationRollup.objects.filter(section=section).update(
+            sessions_held=F("sessions_held") + delta
+        )
+
+
+def add_session_attended(student_id, session_id, delta):
+    """Add delta to sessions_attended of the student in the section of a session"""
+    section = Class.objects.filter(pk=session_id).values("name")
+    ParticipationRollup.objects.filter(
+        student_id=student_id, section=Subquery(section)
+    ).update(sessions_attended=F("sessions_attended") + delta)
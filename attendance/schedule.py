@@ -0,0 +1,140 @@
+# attendance/schedule.py
+# generate a term of class sessions from weekly recurrence rules
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/28/2025
+
+import bisect
+import hashlib
+import hmac
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Class, add_sessions_held, bump_classes_version, rollups_enabled
+
+# letters of the days of the week in a rule such as "MWF" or "TR"
+WEEKDAYS = {"M": 0, "T": 1, "W": 2, "R": 3, "F": 4, "S": 5, "U": 6}
+
+# sessions in the same classroom closer together than this overlap
+SESSION_LENGTH = timedelta(minutes=50)
+
+
+def session_answer(name, day):
+    """
+    Return the answer from 1 to 10 of the session of section name on day.
+    It is derived from SECRET_KEY, so a preview and the sessions created
+    from it agree, but students cannot work it out.
+    """
+    message = f"{name}:{day.isoformat()}".encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+    return str(int.from_bytes(digest[:8], "big") % 10 + 1)
+
+
+def parse_days(days):
+    """Return the weekday numbers of a rule such as "MWF", or raise ValueError"""
+    days = days.replace(" ", "").upper()
+    unknown = set(days) - set(WEEKDAYS)
+    if unknown:
+        raise ValueError(f"unknown days {''.join(sorted(unknown))!r}, use MTWRFSU")
+    return {WEEKDAYS[day] for day in days}
+
+
+def generate_sessions(rules, start, end, skip=()):
+    """
+    Return unsaved Classes for every day from start to end (inclusive) on
+    which a section meets, as (section, weekdays) pairs in rules, leaving out
+    the dates in skip. Each session gets the answer from session_answer().
+    """
+    skip = set(skip)
+    sessions = []
+    day = start
+    while day <= end:
+        if day not in skip:
+            for section, weekdays in rules:
+                if day.weekday() in weekdays:
+                    sessions.append(
+                        Class(
+                            name=section.name,
+                            session_time=section.get_session_time(day),
+                            answer=session_answer(section.name, day),
+                            latitude=section.latitude,
+                            longitude=section.longitude,
+                        )
+                    )
+        day += timedelta(days=1)
+    return sessions
+
+
+def find_conflicts(sessions):
+    """
+    Set conflict on every generated session to a reason it should not be
+    created, or None. A session conflicts if its section already has a
+    session that day, or if a session in the same classroom starts less
+    than SESSION_LENGTH apart. Sessions are compared with the existing ones,
+    read in one query, and with the earlier generated sessions that do not
+    conflict, so of two overlapping generated sessions the first is kept.
+    """
+    for session in sessions:
+        session.conflict = None
+    if not sessions:
+        return sessions
+
+    times = [session.session_time for session in sessions]
+    existing = list(
+        Class.objects.filter(
+            session_time__gte=min(times) - SESSION_LENGTH,
+            session_time__lte=max(times) + SESSION_LENGTH,
+        ).order_by("session_time")
+    )
+
+    booked = {
+        (session.name, timezone.localdate(session.session_time)) for session in existing
+    }
+    starts = [session.session_time for session in existing]
+    # the latest accepted generated session in each classroom
+    latest = {}
+
+    for session in sorted(sessions, key=lambda session: session.session_time):
+        day = timezone.localdate(session.session_time)
+        room = (session.latitude, session.longitude)
+        if (session.name, day) in booked:
+            session.conflict = f"{session.name} already meets on {day}"
+            continue
+
+        lo = bisect.bisect_right(starts, session.session_time - SESSION_LENGTH)
+        hi = bisect.bisect_left(starts, session.session_time + SESSION_LENGTH)
+        nearby = [
+            other
+            for other in existing[lo:hi]
+            if (other.latitude, other.longitude) == room
+        ]
+        previous = latest.get(room)
+        if previous and session.session_time - previous.session_time < SESSION_LENGTH:
+            nearby.append(previous)
+        if nearby:
+            other = nearby[0]
+            session.conflict = f"overlaps {other.name} at {other.session_time}"
+            continue
+
+        booked.add((session.name, day))
+        latest[room] = session
+
+    return sessions
+
+
+def create_sessions(sessions):
+    """
+    Insert the sessions that do not conflict in one transaction and return
+    them. Conflicts are checked again inside the transaction, so sessions
+    another instructor created since a preview are not double-booked.
+    """
+    with transaction.atomic():
+        find_conflicts(sessions)
+        created = Class.objects.bulk_create(
+            [session for session in sessions if not session.conflict]
+        )
+        # bulk_create sends no post_save signals
+        if rollups_enabled():
+            add_sessions_held(Counter(session.name for session in created))
+    bump_classes_version()
+    return created
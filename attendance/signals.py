@@ -0,0 +1,78 @@
+# attendance/signals.py
+# signal handlers keeping the attendance caches and rollups current
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/24/2025
+
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import *
+
+
+@receiver(pre_save, sender=Class)
+def class_saving(sender, instance, **kwargs):
+    """Remember the section of a session before it is saved"""
+    instance._previous_name = None
+    if instance.pk is not None and rollups_enabled():
+        instance._previous_name = (
+            Class.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Class)
+def class_saved(sender, instance, created, **kwargs):
+    """
+    Drop the cached active sessions and count a new session as held. A
+    session moved to another section is recounted for the students of both.
+    """
+    bump_classes_version()
+    if not rollups_enabled():
+        return
+    if created:
+        add_sessions_held({instance.name: 1})
+    elif instance._previous_name not in (None, instance.name):
+        sections = [instance._previous_name, instance.name]
+        refresh_rollups(
+            Profile.objects.filter(
+                Q(lecture__in=sections) | Q(discussion__in=sections)
+            ).values_list("pk", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Class)
+def class_deleted(sender, instance, **kwargs):
+    """Drop the cached active sessions and stop counting the session as held"""
+    bump_classes_version()
+    if rollups_enabled():
+        add_sessions_held({instance.name: -1})
+
+
+@receiver(post_save, sender=Attend)
+def attend_saved(sender, instance, created, **kwargs):
+    """Count a new attended session, or recount after an Attend changes"""
+    if not rollups_enabled():
+        return
+    if not created:
+        refresh_rollups([instance.student_id])
+    elif instance.status == "attended":
+        add_session_attended(instance.student_id, instance.session_id, 1)
+
+
+@receiver(post_delete, sender=Attend)
+def attend_deleted(sender, instance, **kwargs):
+    """Stop counting a deleted attended session"""
+    if rollups_enabled() and instance.status == "attended":
+        add_session_attended(instance.student_id, instance.session_id, -1)
+
+
+@receiver(post_save, sender=Profile)
+def profile_saved(sender, instance, **kwargs):
+    """Recount a student whose sections may have changed"""
+    if rollups_enabled():
+        refresh_rollups([instance.pk])
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+def section_changed(sender, instance, **kwargs):
+    """Make every process reload the sections when one changes"""
+    bump_sections_version()
@@ -0,0 +1,132 @@
+# attendance/signin.py
+# burst-tolerant ingestion of attendance sign-ins
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/26/2025
+
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from .models import Attend, Class, Profile, refresh_rollups, rollups_enabled
+
+logger = logging.getLogger(__name__)
+
+# most sign-ins written by one batch
+MAX_BATCH = 500
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def batch_interval():
+    """Return how long sign-ins wait to be written together, in seconds"""
+    return getattr(settings, "ATTENDANCE_SIGNIN_BATCH_MS", 0) / 1000
+
+
+def save_signins(attends):
+    """
+    Insert attends in one transaction. A student who already signed in to
+    the session keeps the first record, so repeated taps change nothing.
+    Sign-ins for a session or student deleted since are dropped: SQLite
+    checks foreign keys at commit, so one of them would fail the batch.
+    """
+    with transaction.atomic():
+        sessions = set(
+            Class.objects.filter(
+                pk__in={attend.session_id for attend in attends}
+            ).values_list("pk", flat=True)
+        )
+        students = set(
+            Profile.objects.filter(
+                pk__in={attend.student_id for attend in attends}
+            ).values_list("pk", flat=True)
+        )
+        attends = [
+            attend
+            for attend in attends
+            if attend.session_id in sessions and attend.student_id in students
+        ]
+        Attend.objects.bulk_create(attends, ignore_conflicts=True)
+        # bulk_create sends no post_save signals
+        if rollups_enabled():
+            refresh_rollups(
+                {attend.student_id for attend in attends if attend.status == "attended"}
+            )
+
+
+class SigninBatcher:
+    """A writer thread that commits queued sign-ins in short batches"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name="attendance-signin", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, attend):
+        """Queue attend to be written with the next batch"""
+        self.queue.put(attend)
+
+    def next_batch(self):
+        """Wait for a sign-in, then collect those arriving within the interval"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.interval
+        try:
+            while len(batch) < MAX_BATCH:
+                timeout = max(deadline - time.monotonic(), 0)
+                batch.append(self.queue.get(timeout=timeout))
+        except queue.Empty:
+            pass
+        return batch
+
+    def run(self):
+        """Write batches until the process exits"""
+        while True:
+            batch = self.next_batch()
+            try:
+                save_signins(batch)
+            except DatabaseError:
+                logger.exception("Could not save %d sign-ins", len(batch))
+                # start over with a fresh connection, then save what we can
+                connection.close()
+                self.save_one_by_one(batch)
+
+    def save_one_by_one(self, batch):
+        """Save each sign-in of a failed batch on its own"""
+        for attend in batch:
+            try:
+                save_signins([attend])
+            except DatabaseError:
+                logger.exception(
+                    "Could not save the sign-in of student %s to session %s",
+                    attend.student_id,
+                    attend.session_id,
+                )
+                connection.close()
+
+
+def get_batcher():
+    """Return the shared SigninBatcher, or None to write sign-ins right away"""
+    global _batcher
+    interval = batch_interval()
+    if not interval:
+        return None
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SigninBatcher(interval)
+    return _batcher
+
+
+def record_signin(attend):
+    """
+    Store an unsaved Attend, queued for the next batch when
+    ATTENDANCE_SIGNIN_BATCH_MS is set and written immediately otherwise.
+    """
+    batcher = get_batcher()
+    if batcher is None:
+        save_signins([attend])
+    else:
+        batcher.submit(attend)
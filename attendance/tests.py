@@ -1,3 +1,630 @@
-from django.test import TestCase
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from unittest import mock
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from cs412.profiling import QueryBudgetExceeded
+from .models import *
+from .appeals import adjudicate_appeals
+from .schedule import create_sessions, find_conflicts, generate_sessions, parse_days
+from .signin import record_signin, save_signins
+from .views import export_csv
 
-# Create your tests here.
+
+class ParticipationReportTests(TestCase):
+    """Check the grouped participation report against the per-student methods"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        sessions = [
+            Class.objects.create(
+                session_time=now - timedelta(days=i),
+                name=name,
+                answer="1",
+                latitude=42.35,
+                longitude=-71.103,
+            )
+            for i, name in enumerate(["CS 412 A1", "CS 412 C1", "CS 412 C2"] * 3)
+        ]
+        sections = [("CS 412 A1", "CS 412 C1"), ("CS 412 A1", "CS 412 C2"), ("", "")]
+        for i, (lecture, discussion) in enumerate(sections):
+            student = Profile.objects.create(
+                first_name="Student",
+                last_name=str(i),
+                is_instructor=False,
+                lecture=lecture,
+                discussion=discussion,
+                user=User.objects.create(username=f"student{i}"),
+            )
+            for j, session in enumerate(sessions[i:]):
+                Attend.objects.create(
+                    student=student,
+                    session=session,
+                    answer="1",
+                    latitude=42.35,
+                    longitude=-71.103,
+                    status="attended" if j % 2 == 0 else "submitted",
+                )
+
+    def test_report_matches_per_student_methods(self):
+        sessions = session_counts()
+        with self.assertNumQueries(1):
+            students = list(Profile.objects.order_by("pk").with_participation())
+        for student in students:
+            student.set_participation(sessions)
+            self.assertEqual(
+                student.lecture_participation, student.get_lecture_participation()
+            )
+            self.assertEqual(
+                student.discussion_participation,
+                student.get_discussion_participation(),
+            )
+            self.assertEqual(
+                student.total_participation, student.get_total_participation()
+            )
+
+
+class SectionRegistryTests(TestCase):
+    """Check that every process reloads the sections after one changes"""
+
+    def test_sections_reload_after_another_process_edits_one(self):
+        sections = get_sections()
+        # reload the rolled back sections for the following tests
+        self.addCleanup(bump_sections_version)
+        # an edit in another process shares only the versions cache with this one
+        Section.objects.filter(name="CS 412 A1").update(latitude=0)
+        self.assertIs(get_sections(), sections)
+        caches["versions"].set(SECTIONS_VERSION_KEY, time.time_ns(), None)
+        self.assertEqual(get_sections()["CS 412 A1"].latitude, 0)
+
+
+class ScheduleTests(TestCase):
+    """Check the generation of a term of sessions and its conflict checks"""
+
+    def test_parse_days(self):
+        self.assertEqual(parse_days("m w f"), {0, 2, 4})
+        self.assertEqual(parse_days("TR"), {1, 3})
+        with self.assertRaises(ValueError):
+            parse_days("MX")
+
+    def test_generate_sessions_leaves_out_skipped_dates(self):
+        monday = date(2025, 9, 1)
+        sessions = generate_sessions(
+            [(get_section("CS 412 A1"), {0, 2, 4})],
+            monday,
+            monday + timedelta(days=13),
+            skip=[monday + timedelta(days=2)],
+        )
+        self.assertEqual(
+            [timezone.localdate(session.session_time) for session in sessions],
+            [monday + timedelta(days=days) for days in [0, 4, 7, 9, 11]],
+        )
+
+    def test_conflicts_keep_the_first_session(self):
+        lecture = get_section("CS 412 A1")
+        monday = date(2025, 9, 1)
+        Class.objects.create(
+            name=lecture.name,
+            session_time=lecture.get_session_time(monday),
+            answer="1",
+            latitude=lecture.latitude,
+            longitude=lecture.longitude,
+        )
+        sessions = generate_sessions(
+            [(lecture, {0, 1})], monday, monday + timedelta(days=1)
+        )
+        # another section in the same classroom half an hour later
+        tuesday = sessions[1].session_time
+        sessions.insert(
+            0,
+            Class(
+                name="CS 412 B1",
+                session_time=tuesday + timedelta(minutes=30),
+                answer="1",
+                latitude=lecture.latitude,
+                longitude=lecture.longitude,
+            ),
+        )
+
+        find_conflicts(sessions)
+        self.assertEqual(
+            [session.conflict is not None for session in sessions],
+            [True, True, False],
+        )
+
+        created = create_sessions(sessions)
+        self.assertEqual([session.session_time for session in created], [tuesday])
+        self.assertEqual(Class.objects.count(), 2)
+
+
+class AppealAdjudicationTests(TestCase):
+    """Check that instructors can approve or reject appeals in bulk"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create(username="instructor")
+        Profile.objects.create(
+            first_name="Ada",
+            last_name="Instructor",
+            is_instructor=True,
+            user=cls.instructor,
+        )
+        student = Profile.objects.create(
+            first_name="Student",
+            last_name="One",
+            is_instructor=False,
+            lecture="CS 412 A1",
+            discussion="CS 412 C1",
+            user=User.objects.create(username="student"),
+        )
+        now = timezone.now()
+        cls.appeals = []
+        for i in range(60):
+            session = Class.objects.create(
+                session_time=now - timedelta(days=i + 1),
+                name="CS 412 A1",
+                answer="3",
+                latitude=42.35,
+                longitude=-71.103,
+            )
+            cls.appeals.append(
+                Appeal.objects.create(
+                    student=student, session=session, reason="GPS", status="submitted"
+                )
+            )
+        # the first student signed in too far away before appealing
+        Attend.objects.create(
+            student=student,
+            session=cls.appeals[0].session,
+            answer="3",
+            latitude=0,
+            longitude=0,
+            status="submitted",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.instructor)
+
+    def adjudicate(self, appeals, **data):
+        return self.client.post(
+            reverse("adjudicate_appeals"),
+            {"appeal": [appeal.pk for appeal in appeals], **data},
+        )
+
+    def test_approve_updates_existing_signin(self):
+        response = self.adjudicate(self.appeals[:2], action="approve")
+        self.assertRedirects(response, reverse("handle_appeal"))
+
+        attends = Attend.objects.order_by("-session__session_time")
+        self.assertEqual(
+            list(attends.values_list("session", "status", "latitude")),
+            [(appeal.session_id, "attended", 42.35) for appeal in self.appeals[:2]],
+        )
+        self.assertEqual(Appeal.objects.filter(status="approved").count(), 2)
+
+    def test_reject_leaves_signins_alone(self):
+        self.adjudicate(self.appeals[:2], action="reject")
+        self.assertEqual(
+            list(Attend.objects.values_list("status", flat=True)), ["submitted"]
+        )
+        self.assertEqual(Appeal.objects.filter(status="rejected").count(), 2)
+
+    def test_unknown_action_is_refused(self):
+        for data in [{}, {"action": "maybe"}]:
+            response = self.adjudicate(self.appeals[:2], **data)
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(Appeal.objects.filter(status="submitted").count(), 60)
+
+    def test_appeal_pages_use_constant_queries(self):
+        url = reverse("handle_appeal")
+        for page in [1, 2]:
+            with self.assertNumQueries(5):
+                response = self.client.get(url, {"page": page})
+            self.assertEqual(len(response.context["appeals"]), [50, 10][page - 1])
+
+
+class GenerateScheduleViewTests(TestCase):
+    """Check that instructors create the sessions they previewed"""
+
+    def test_created_answers_match_preview(self):
+        user = User.objects.create(username="instructor")
+        Profile.objects.create(
+            first_name="Ada", last_name="Instructor", is_instructor=True, user=user
+        )
+        self.client.force_login(user)
+        lecture = get_section("CS 412 A1")
+        data = {
+            "start_date": "2025-09-01",
+            "end_date": "2025-09-30",
+            f"days_{lecture.pk}": "MWF",
+        }
+        url = reverse("generate_schedule")
+
+        response = self.client.post(url, {**data, "preview": "Preview"})
+        previewed = [
+            (session.session_time, session.answer)
+            for session in response.context["sessions"]
+        ]
+        self.assertEqual(len(previewed), 13)
+
+        response = self.client.post(url, data)
+        self.assertRedirects(response, reverse("show_all_classes"))
+        self.assertEqual(
+            list(
+                Class.objects.order_by("session_time").values_list(
+                    "session_time", "answer"
+                )
+            ),
+            previewed,
+        )
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Check that the attendance pages stay within their query budgets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        sessions = [
+            Class.objects.create(
+                session_time=now - timedelta(days=i),
+                name=name,
+                answer="1",
+                latitude=42.35,
+                longitude=-71.103,
+            )
+            for i, name in enumerate(["CS 412 A1", "CS 412 C1"] * 5)
+        ]
+        cls.instructor = User.objects.create(username="instructor")
+        Profile.objects.create(
+            first_name="Ada",
+            last_name="Instructor",
+            is_instructor=True,
+            user=cls.instructor,
+        )
+        cls.students = []
+        for i in range(5):
+            user = User.objects.create(username=f"student{i}")
+            student = Profile.objects.create(
+                first_name="Student",
+                last_name=str(i),
+                is_instructor=False,
+                lecture="CS 412 A1",
+                discussion="CS 412 C1",
+                user=user,
+            )
+            cls.students.append(user)
+            for session in sessions[i:]:
+                Attend.objects.create(
+                    student=student,
+                    session=session,
+                    answer="1",
+                    latitude=42.35,
+                    longitude=-71.103,
+                    status="attended",
+                )
+            for session in sessions[:i]:
+                Appeal.objects.create(
+                    student=student, session=session, reason="late", status="submitted"
+                )
+
+    def test_export_csv_counts_streamed_queries(self):
+        self.client.force_login(self.instructor)
+        response = self.client.get(reverse("export_csv"))
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+
+    def test_export_csv_over_budget_raises_while_streaming(self):
+        self.client.force_login(self.instructor)
+        with mock.patch.object(export_csv, "query_budget", 1):
+            response = self.client.get(reverse("export_csv"))
+            with self.assertRaises(QueryBudgetExceeded):
+                b"".join(response.streaming_content)
+
+    def test_student_attendance_within_budget(self):
+        self.client.force_login(self.instructor)
+        response = self.client.get(reverse("student_attendance"))
+        self.assertEqual(len(response.context["records"]), 5)
+
+    def test_attendance_history_within_budget(self):
+        self.client.force_login(self.students[4])
+        response = self.client.get(reverse("attendance"))
+        self.assertEqual(len(response.context["records"]), 10)
+
+
+class StudentHistoryTests(TestCase):
+    """Check that the attendance history page runs the same queries for any term"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="student")
+        self.student = Profile.objects.create(
+            first_name="Student",
+            last_name="One",
+            is_instructor=False,
+            lecture="CS 412 A1",
+            discussion="CS 412 C1",
+            user=self.user,
+        )
+        self.client.force_login(self.user)
+
+    def add_sessions(self, count):
+        """Add count sessions, attending or appealing all but every third one"""
+        for i in range(count):
+            session = Class.objects.create(
+                session_time=timezone.now() - timedelta(days=i),
+                name=["CS 412 A1", "CS 412 C1"][i % 2],
+                answer="1",
+                latitude=42.35,
+                longitude=-71.103,
+            )
+            if i % 3 == 0:
+                Attend.objects.create(
+                    student=self.student,
+                    session=session,
+                    answer="1",
+                    latitude=42.35,
+                    longitude=-71.103,
+                    status="attended",
+                )
+            elif i % 3 == 1:
+                Appeal.objects.create(
+                    student=self.student,
+                    session=session,
+                    reason="GPS",
+                    status="submitted",
+                )
+
+    def test_constant_queries(self):
+        # load the sections into their cache first
+        self.client.get(reverse("attendance"))
+
+        # session, user and profile, page count and rows, attends, appeals,
+        # and the attended and held counts for the participation rates
+        for count in [2, 6, 12]:
+            self.add_sessions(count)
+            with self.subTest(count=count), self.assertNumQueries(9):
+                response = self.client.get(reverse("attendance"))
+            profile = response.context["profile"]
+            self.assertEqual(
+                profile.total_participation, self.student.get_total_participation()
+            )
+            records = response.context["records"]
+            self.assertEqual(
+                sum(r.attend_record is not None for r in records),
+                Attend.objects.filter(student=self.student).count(),
+            )
+            self.assertEqual(
+                sum(r.appeal_record is not None for r in records),
+                Appeal.objects.filter(student=self.student).count(),
+            )
+
+
+class ActiveSessionsTests(TestCase):
+    """Check that the cached active sessions follow changes to the sessions"""
+
+    def create_session(self, when):
+        return Class.objects.create(
+            session_time=when,
+            name="CS 412 A1",
+            answer="1",
+            latitude=42.35,
+            longitude=-71.103,
+        )
+
+    def test_cache_invalidated_on_create_edit_and_delete(self):
+        now = timezone.now()
+        first = self.create_session(now)
+        self.assertEqual(active_sessions(now), [first])
+        with self.assertNumQueries(0):
+            self.assertEqual(active_sessions(now), [first])
+
+        second = self.create_session(now)
+        self.assertEqual(active_sessions(now), [first, second])
+
+        first.session_time = now - timedelta(days=1)
+        first.save()
+        self.assertEqual(active_sessions(now), [second])
+
+        second.delete()
+        self.assertEqual(active_sessions(now), [])
+
+
+class SigninTests(TestCase):
+    """Check that signing in is idempotent"""
+
+    def test_repeated_signin_keeps_first_record(self):
+        user = User.objects.create(username="student")
+        Profile.objects.create(
+            first_name="Student",
+            last_name="One",
+            is_instructor=False,
+            lecture="CS 412 A1",
+            discussion="CS 412 C1",
+            user=user,
+        )
+        session = Class.objects.create(
+            session_time=timezone.now(),
+            name="CS 412 A1",
+            answer="3",
+            latitude=42.35,
+            longitude=-71.103,
+        )
+        self.client.force_login(user)
+        url = reverse("mark_attendance", args=[session.pk])
+        for answer in ["3", "4"]:
+            response = self.client.post(
+                url, {"answer": answer, "lat": "42.351", "lng": "-71.102"}
+            )
+            self.assertEqual(response.status_code, 302)
+
+        attend = Attend.objects.get(session=session)
+        self.assertEqual(attend.status, "attended")
+
+
+@override_settings(ATTENDANCE_ROLLUPS=True)
+class ParticipationRollupTests(TestCase):
+    """Check that the rollups maintained on writes match a full rebuild"""
+
+    def rollup_counts(self):
+        return sorted(
+            ParticipationRollup.objects.values_list(
+                "student_id", "section", "sessions_held", "sessions_attended"
+            )
+        )
+
+    def test_rollups_follow_writes(self):
+        sections = get_sections()
+        lecture, discussion = sections["CS 412 A1"], sections["CS 412 C1"]
+        students = [
+            Profile.objects.create(
+                first_name="Student",
+                last_name=str(i),
+                is_instructor=False,
+                lecture=lecture.name,
+                discussion=discussion.name,
+                user=User.objects.create(username=f"student{i}"),
+            )
+            for i in range(3)
+        ]
+        start = timezone.localdate() - timedelta(days=30)
+        create_sessions(
+            generate_sessions(
+                [(lecture, {0, 2, 4}), (discussion, {3})], start, timezone.localdate()
+            )
+        )
+        sessions = list(Class.objects.order_by("pk"))
+        session = Class.objects.create(
+            session_time=timezone.now(),
+            name=lecture.name,
+            answer="1",
+            latitude=lecture.latitude,
+            longitude=lecture.longitude,
+        )
+
+        for student in students[:2]:
+            for past in sessions[::2]:
+                record_signin(
+                    Attend(
+                        student=student,
+                        session=past,
+                        answer=past.answer,
+                        latitude=past.latitude,
+                        longitude=past.longitude,
+                        status="attended",
+                    )
+                )
+        Attend.objects.create(
+            student=students[2],
+            session=session,
+            answer="2",
+            latitude=0,
+            longitude=0,
+            status="submitted",
+        )
+        appeal = Appeal.objects.create(
+            student=students[2], session=session, reason="GPS", status="submitted"
+        )
+        adjudicate_appeals([appeal.pk], approve=True)
+        sessions[0].delete()
+        # move a session with sign-ins to the discussion section
+        sessions[2].name = discussion.name
+        sessions[2].save()
+
+        maintained = self.rollup_counts()
+        rebuild_rollups()
+        self.assertEqual(maintained, self.rollup_counts())
+
+        student = Profile.objects.get(pk=students[0].pk)
+        with self.assertNumQueries(1):
+            participation = [
+                student.get_lecture_participation(),
+                student.get_discussion_participation(),
+                student.get_total_participation(),
+            ]
+        with self.settings(ATTENDANCE_ROLLUPS=False):
+            self.assertEqual(
+                participation,
+                [
+                    student.get_lecture_participation(),
+                    student.get_discussion_participation(),
+                    student.get_total_participation(),
+                ],
+            )
+
+
+@override_settings(ATTENDANCE_ROLLUPS=True)
+class RollupTransactionTests(TransactionTestCase):
+    """Check that a session is not saved without its rollup update"""
+
+    # keep the sections added by the migrations for the following tests
+    serialized_rollback = True
+
+    def test_failed_rollup_update_rolls_back_the_session(self):
+        with mock.patch(
+            "attendance.signals.add_sessions_held", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                Class.objects.create(
+                    session_time=timezone.now(),
+                    name="CS 412 A1",
+                    answer="1",
+                    latitude=42.35,
+                    longitude=-71.103,
+                )
+        self.assertFalse(Class.objects.exists())
+
+
+class SigninBatchTests(TransactionTestCase):
+    """Check that one stale sign-in does not lose the rest of its batch"""
+
+    # keep the sections added by the migrations for the following tests
+    serialized_rollback = True
+
+    def test_signin_for_deleted_session_is_dropped(self):
+        sessions = [
+            Class.objects.create(
+                session_time=timezone.now(),
+                name="CS 412 A1",
+                answer="1",
+                latitude=42.35,
+                longitude=-71.103,
+            )
+            for _ in range(2)
+        ]
+        students = [
+            Profile.objects.create(
+                first_name="Student",
+                last_name=str(i),
+                is_instructor=False,
+                lecture="CS 412 A1",
+                user=User.objects.create(username=f"student{i}"),
+            )
+            for i in range(3)
+        ]
+        batch = [
+            Attend(
+                student_id=student.pk,
+                session_id=session.pk,
+                answer="1",
+                latitude=42.35,
+                longitude=-71.103,
+                status="attended",
+            )
+            for student in students
+            for session in sessions
+        ]
+        # the session is deleted while its sign-ins wait for the batch
+        Class.objects.filter(pk=sessions[1].pk).delete()
+
+        save_signins(batch)
+
+        self.assertEqual(
+            sorted(Attend.objects.values_list("student_id", "session_id")),
+            [(student.pk, sessions[0].pk) for student in students],
+        )
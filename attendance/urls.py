@@ -13,6 +13,11 @@ urlpatterns = [
     path("profile", ProfileView.as_view(), name="profile_page"),
     path("signin/<int:pk>", SigninView.as_view(), name="signin"),
     path("profile/create_class", CreateClassView.as_view(), name="create_class"),
+    path(
+        "profile/generate_schedule",
+        GenerateScheduleView.as_view(),
+        name="generate_schedule",
+    ),
     path(
         "profile/show_all_classes",
         ShowAllClassesView.as_view(),
@@ -64,6 +69,11 @@ urlpatterns = [
         HandleAppealsView.as_view(),
         name="handle_appeal",
     ),
+    path(
+        "profile/handle_appeal/adjudicate",
+        AdjudicateAppealsView.as_view(),
+        name="adjudicate_appeals",
+    ),
     path(
         "profile/<int:pk>/approve",
         ApproveView.as_view(),
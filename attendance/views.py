@@ -2,22 +2,47 @@
 # views for the attendance application
 # Author: Yihang Duanmu (harrydm@bu.edu), 12/2/2025
 
-from django.shortcuts import render, redirect
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render, redirect
 from django.urls import reverse
 from django.db.models import Q
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.views.generic import ListView, DetailView, CreateView, DeleteView, View
-from django.http import HttpResponse
+from django.views.generic import (
+    ListView,
+    DetailView,
+    CreateView,
+    DeleteView,
+    FormView,
+    View,
+)
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from .models import *
 from .forms import *
-from datetime import datetime, time
+from .appeals import adjudicate_appeals
+from .schedule import create_sessions, find_conflicts, generate_sessions
+from .signin import record_signin
+from cs412.profiling import query_budget
 from django.contrib.auth.mixins import LoginRequiredMixin
 import csv
 
 
+def get_request_profile(request):
+    """
+    Return the Profile of the logged-in user, loaded at most once per request
+    and shared by the mixins and views that need it.
+    Raise Profile.DoesNotExist if the user has no profile.
+    """
+    if not hasattr(request, "attendance_profile"):
+        request.attendance_profile = Profile.objects.select_related("user").get(
+            user=request.user
+        )
+    return request.attendance_profile
+
+
 class RoleRequiredMixin(LoginRequiredMixin):
     """A parent mixin for custom user requirements"""
 
@@ -36,7 +61,7 @@ class RoleRequiredMixin(LoginRequiredMixin):
 
         # Ensure the user has a profile
         try:
-            profile = Profile.objects.get(user=user)
+            profile = get_request_profile(request)
         except Profile.DoesNotExist:
             return self.handle_no_permission()
 
@@ -49,6 +74,10 @@ class RoleRequiredMixin(LoginRequiredMixin):
 
         return super().dispatch(request, *args, **kwargs)
 
+    def get_profile(self):
+        """Return the Profile of the logged-in user loaded by dispatch"""
+        return get_request_profile(self.request)
+
 
 class InstructorRequiredMixin(RoleRequiredMixin):
     """A mixin to require user be an instructor"""
@@ -77,7 +106,7 @@ class ProfileView(UserRequiredMixin, DetailView):
     context_object_name = "profile"
 
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
 
 class SigninView(StudentRequiredMixin, DetailView):
@@ -90,7 +119,7 @@ class SigninView(StudentRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         """Return the dictionary of context variables for use in the template"""
         context = super().get_context_data(**kwargs)
-        context["profile"] = Profile.objects.get(user=self.request.user)
+        context["profile"] = self.get_profile()
         return context
 
 
@@ -104,7 +133,7 @@ class CreateClassView(InstructorRequiredMixin, CreateView):
 
     def get_object(self):
         """Get the profile associated with the current user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
     def get_success_url(self):
         """Provide a URL to redirect to after creating a new Class"""
@@ -115,66 +144,55 @@ class CreateClassView(InstructorRequiredMixin, CreateView):
     def form_valid(self, form):
         """This method handles the form submission and saves the new object to the Django database"""
 
-        # Create a new user form from POST data
-        if self.request.POST:
-            request = self.request.POST
-            class_chosen = request.get("class_name")
-            # Assign location and session to chosen class
-            if class_chosen == "CS 412 A1":
-                latitude = 42.350
-                longitude = -71.103
-                date_obj = datetime.strptime(
-                    request.get("session_time"), "%Y-%m-%d"
-                ).date()
-                session_time = datetime.combine(date_obj, time(9, 30))
-
-            elif class_chosen == "CS 412 B1":
-                latitude = 42.350
-                longitude = -71.103
-                date_obj = datetime.strptime(
-                    request.get("session_time"), "%Y-%m-%d"
-                ).date()
-                session_time = datetime.combine(date_obj, time(11, 0))
-
-            elif class_chosen == "CS 412 C1":
-                latitude = 42.349
-                longitude = -71.104
-                date_obj = datetime.strptime(
-                    request.get("session_time"), "%Y-%m-%d"
-                ).date()
-                session_time = datetime.combine(date_obj, time(12, 20))
-
-            elif class_chosen == "CS 412 C2":
-                latitude = 42.349
-                longitude = -71.104
-                date_obj = datetime.strptime(
-                    request.get("session_time"), "%Y-%m-%d"
-                ).date()
-                session_time = datetime.combine(date_obj, time(13, 25))
-
-            elif class_chosen == "CS 412 C3":
-                latitude = 42.350
-                longitude = -71.105
-                date_obj = datetime.strptime(
-                    request.get("session_time"), "%Y-%m-%d"
-                ).date()
-                session_time = datetime.combine(date_obj, time(14, 30))
-
-            elif class_chosen == "Test - CS 412 A1":
-                latitude = 42.350
-                longitude = -71.103
-                session_time = datetime.now()
-
-            else:
-                return "Something's wrong"
-
-            form.instance.answer = request.get("answer")
-            form.instance.name = class_chosen
-            form.instance.latitude = latitude
-            form.instance.longitude = longitude
-            form.instance.session_time = session_time
-
-            return super().form_valid(form)
+        # Assign location and session time of the chosen section
+        section = get_section(form.cleaned_data["class_name"])
+        if section is None:
+            form.add_error("class_name", "This section no longer exists.")
+            return self.form_invalid(form)
+
+        form.instance.answer = form.cleaned_data["answer"]
+        form.instance.name = section.name
+        form.instance.latitude = section.latitude
+        form.instance.longitude = section.longitude
+        form.instance.session_time = section.get_session_time(
+            form.cleaned_data["session_time"].date()
+        )
+
+        return super().form_valid(form)
+
+
+class GenerateScheduleView(InstructorRequiredMixin, FormView):
+    """A view to create a whole term of Class sessions at once"""
+
+    form_class = GenerateScheduleForm
+    template_name = "attendance/generate_schedule_form.html"
+
+    def get_context_data(self, **kwargs):
+        """Return the dictionary of context variables for use in the template"""
+        context = super().get_context_data(**kwargs)
+        context["profile"] = self.get_profile()
+        return context
+
+    def form_valid(self, form):
+        """Preview the generated sessions, or create those without conflicts"""
+        sessions = generate_sessions(
+            form.cleaned_data["rules"],
+            form.cleaned_data["start_date"],
+            form.cleaned_data["end_date"],
+            form.cleaned_data["skip"],
+        )
+        if "preview" in self.request.POST:
+            find_conflicts(sessions)
+            return self.render_to_response(
+                self.get_context_data(
+                    form=form,
+                    sessions=sessions,
+                    conflicts=sum(1 for session in sessions if session.conflict),
+                )
+            )
+
+        create_sessions(sessions)
+        return redirect("show_all_classes")
 
 
 class ShowAllClassesView(InstructorRequiredMixin, DetailView):
@@ -186,7 +204,7 @@ class ShowAllClassesView(InstructorRequiredMixin, DetailView):
 
     def get_object(self):
         """Get the profile associated with the current user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
     def get_context_data(self, **kwargs):
         """Return the dictionary of context vatiable for use in the template"""
@@ -206,7 +224,7 @@ class DeleteClassView(InstructorRequiredMixin, DeleteView):
     def get_context_data(self, **kwargs):
         """Return the dictionary of context variables for use in the template"""
         context = super().get_context_data(**kwargs)
-        context["profile"] = Profile.objects.get(user=self.request.user)
+        context["profile"] = self.get_profile()
         return context
 
     def get_success_url(self):
@@ -221,16 +239,25 @@ class ShowStudentsInClassView(InstructorRequiredMixin, ListView):
     template_name = "attendance/students_attend_classes.html"
     context_object_name = "records"
     paginate_by = 20
+    query_budget = 6
 
     def get_queryset(self):
         """handle searching for records"""
         records = super().get_queryset()
-        records = records.filter(is_instructor=False)
-        return records
+        records = records.filter(is_instructor=False).order_by("pk")
+        return records.with_participation()
 
     def get_object(self):
         """Get the profile associated with the current user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
+
+    def get_context_data(self, **kwargs):
+        """Return the dictionary of context variables for use in the template"""
+        context = super().get_context_data(**kwargs)
+        sessions = session_counts()
+        for r in context["records"]:
+            r.set_participation(sessions)
+        return context
 
 
 class ShowStudentAttendence(StudentRequiredMixin, ListView):
@@ -240,31 +267,55 @@ class ShowStudentAttendence(StudentRequiredMixin, ListView):
     template_name = "attendance/students_attendance.html"
     context_object_name = "records"
     paginate_by = 20
+    query_budget = 10
 
     def get_object(self):
         """Get the profile associated with the current user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
     def get_queryset(self):
         """handle searching for records"""
-        records = super().get_queryset()
-        student = Profile.objects.get(user=self.request.user)
+        student = self.get_profile()
         records = Class.objects.filter(
             Q(name=student.lecture)
             | Q(name=student.discussion)
-            | Q(name="Test - CS 412 A1")
+            | Q(name__in=test_section_names())
         )
-        return records
+        return records.order_by("pk")
 
     def get_context_data(self, **kwargs):
         """Return the dictionary of context variables for use in the template"""
         context = super().get_context_data(**kwargs)
-        student = Profile.objects.get(user=self.request.user)
+        student = self.get_profile()
         context["profile"] = student
-        for r in context["records"]:
-            r.attend_record = Attend.objects.filter(student=student, session=r).first()
-        for r in context["records"]:
-            r.appeal_record = Appeal.objects.filter(student=student, session=r).first()
+
+        # the participation rates in the header, from one grouped query
+        student.lecture_attended, student.discussion_attended = (
+            Profile.objects.filter(pk=student.pk)
+            .with_participation()
+            .values_list("lecture_attended", "discussion_attended")
+            .get()
+        )
+        student.set_participation(session_counts())
+
+        # one query per model for the whole page, keeping the first record
+        # of each session like .first() did
+        records = context["records"]
+        session_ids = [r.pk for r in records]
+        attends = {}
+        for attend in Attend.objects.filter(
+            student=student, session_id__in=session_ids
+        ).order_by("pk"):
+            attends.setdefault(attend.session_id, attend)
+        appeals = {}
+        for appeal in Appeal.objects.filter(
+            student=student, session_id__in=session_ids
+        ).order_by("pk"):
+            appeals.setdefault(appeal.session_id, appeal)
+
+        for r in records:
+            r.attend_record = attends.get(r.pk)
+            r.appeal_record = appeals.get(r.pk)
         return context
 
 
@@ -280,43 +331,54 @@ def redirect_to_my_profile(request):
     return redirect("profile_page")
 
 
-class CreateAttendView(LoginRequiredMixin, View):
-    """Create an Attend relationship between logged-in user and a class"""
+class CreateAttendView(View):
+    """
+    Create an Attend relationship between logged-in user and a class.
+    The view is async so a sign-in rush does not tie up a worker per student.
+    """
 
-    def post(self, request, *args, **kwargs):
+    async def get_session(self, pk):
+        """Return the Class signed in to, from the cached active sessions if possible"""
+        for session in await sync_to_async(active_sessions)():
+            if session.pk == pk:
+                return session
+        return await aget_object_or_404(Class, pk=pk)
+
+    async def post(self, request, *args, **kwargs):
         """Handle post request from the template"""
-        profile = Profile.objects.get(user=self.request.user)
-        session = Class.objects.get(pk=self.kwargs["pk"])
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+
+        profile = await Profile.objects.aget(user=user)
+        session = await self.get_session(self.kwargs["pk"])
         response = self.request.POST
         answer = response.get("answer")
-        latitude = round(float(response.get("lat")), 3)
-        longitude = round(float(response.get("lng")), 3)
-
-        # Create attendance record
-        if (
-            answer == session.answer
-            and session.latitude - 0.004 <= latitude <= session.latitude + 0.004
-            and session.longitude - 0.004 <= longitude <= session.longitude + 0.004
+        latitude = float(response.get("lat"))
+        longitude = float(response.get("lng"))
+
+        # Create attendance record, checking the location against the
+        # section geometry cached in this process
+        if answer == session.answer and await sync_to_async(session.is_near)(
+            latitude, longitude
         ):
             # correct answer and location
-            Attend.objects.create(
-                student=profile,
-                session=session,
-                answer=answer,
-                latitude=latitude,
-                longitude=longitude,
-                status="attended",
-            )
+            status = "attended"
         else:
             # wrong answer or location
-            Attend.objects.create(
+            status = "submitted"
+
+        # repeated taps keep the first sign-in
+        await sync_to_async(record_signin)(
+            Attend(
                 student=profile,
                 session=session,
                 answer=answer,
-                latitude=latitude,
-                longitude=longitude,
-                status="submitted",
+                latitude=round(latitude, 3),
+                longitude=round(longitude, 3),
+                status=status,
             )
+        )
 
         return redirect("profile_page")
 
@@ -329,7 +391,7 @@ class AppealView(StudentRequiredMixin, DetailView):
     context_object_name = "profile"
 
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -342,7 +404,7 @@ class AppealView(StudentRequiredMixin, DetailView):
         # Create a new user form from POST data
         if self.request.POST:
             request = self.request.POST
-            profile = Profile.objects.get(user=self.request.user)
+            profile = self.get_profile()
             session = Class.objects.get(pk=self.kwargs["pk"])
             reason = request.get("reason")
             Appeal.objects.create(
@@ -358,59 +420,54 @@ class HandleAppealsView(InstructorRequiredMixin, ListView):
     model = Profile
     template_name = "attendance/handle_appeals.html"
     context_object_name = "appeals"
+    paginate_by = 50
 
     def get_object(self):
         """Get the profile associated with the current user"""
-        return Profile.objects.get(user=self.request.user)
+        return self.get_profile()
 
     def get_queryset(self):
         """handle searching for records"""
-        appeals = super().get_queryset()
         appeals = Appeal.objects.filter(status="submitted")
-        return appeals
+        return appeals.select_related("student", "session").order_by(
+            "session__session_time", "pk"
+        )
+
+
+class AdjudicateAppealsView(InstructorRequiredMixin, View):
+    """Approve or reject every selected appeal in one request"""
+
+    def post(self, request, *args, **kwargs):
+        """Handle post request from the appeals page"""
+        action = request.POST.get("action")
+        if action not in ("approve", "reject"):
+            return HttpResponseBadRequest("action must be approve or reject")
+
+        appeal_ids = [pk for pk in request.POST.getlist("appeal") if pk.isdigit()]
+        adjudicate_appeals(appeal_ids, approve=action == "approve")
+
+        return redirect("handle_appeal")
 
 
 class ApproveView(InstructorRequiredMixin, View):
     """Approve an appeal and create a new attend relationship"""
 
-    def dispatch(self, request, *args, **kwargs):
-        """Override the dispatch method to add debugging information"""
-        # Get the appeal object
-        appeal = Appeal.objects.get(pk=kwargs["pk"])
-        student = appeal.student
-        session = appeal.session
-
-        # Create new attendance
-        Attend.objects.create(
-            student=student,
-            session=session,
-            answer=session.answer,
-            latitude=session.latitude,
-            longitude=session.longitude,
-            status="attended",
-        )
+    def get(self, request, *args, **kwargs):
+        """Approve the appeal and mark the student attended"""
+        adjudicate_appeals([kwargs["pk"]], approve=True)
 
-        # Change appeal object
-        appeal.status = "approved"
-        appeal.save()
-
-        # Redirect back to the profile page
+        # Redirect back to the appeals page
         return redirect("handle_appeal")
 
 
 class RejectView(InstructorRequiredMixin, View):
     """Reject an appeal and create a new attend relationship"""
 
-    def dispatch(self, request, *args, **kwargs):
-        """Override the dispatch method to add debugging information"""
-        # Get the appeal object
-        appeal = Appeal.objects.get(pk=kwargs["pk"])
+    def get(self, request, *args, **kwargs):
+        """Reject the appeal"""
+        adjudicate_appeals([kwargs["pk"]], approve=False)
 
-        # Change appeal object
-        appeal.status = "rejected"
-        appeal.save()
-
-        # Redirect back to the profile page
+        # Redirect back to the appeals page
         return redirect("handle_appeal")
 
 
@@ -477,32 +534,48 @@ class CreateProfileView(CreateView):
         return reverse("profile_page")
 
 
+class Echo:
+    """A file-like object whose write returns the value, for streaming csv rows"""
+
+    def write(self, value):
+        return value
+
+
+@query_budget(2)
 def export_csv(request):
     """Export student participation to csv"""
-    response = HttpResponse(
-        content_type="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="attendance.csv"'},
-    )
+    writer = csv.writer(Echo())
 
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "Student Name",
-            "Lecture Participation",
-            "Discussion Participation",
-            "Total Participation",
-        ]
-    )  # header row
-
-    # Write rows from your database
-    for student in Profile.objects.filter(is_instructor=False):
-        writer.writerow(
+    def rows():
+        """Yield the csv lines, reading the students in chunks"""
+        yield writer.writerow(
             [
-                f"{student.first_name} {student.last_name}",
-                student.get_lecture_participation(),
-                student.get_discussion_participation(),
-                student.get_total_participation(),
+                "Student Name",
+                "Lecture Participation",
+                "Discussion Participation",
+                "Total Participation",
             ]
+        )  # header row
+
+        sessions = session_counts()
+        students = (
+            Profile.objects.filter(is_instructor=False)
+            .order_by("pk")
+            .with_participation()
         )
+        for student in students.iterator(chunk_size=500):
+            student.set_participation(sessions)
+            yield writer.writerow(
+                [
+                    f"{student.first_name} {student.last_name}",
+                    student.lecture_participation,
+                    student.discussion_participation,
+                    student.total_participation,
+                ]
+            )
 
-    return response
+    return StreamingHttpResponse(
+        rows(),
+        content_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="attendance.csv"'},
+    )
@@ -0,0 +1,113 @@
+# benchmarks/harness.py
+# timing, query counting and reporting for the benchmark suite
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/23/2025
+
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+import django
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmarked view does not answer with 200 OK"""
+
+
+def percentile(samples, p):
+    """Return the p-th percentile of samples by the nearest-rank method."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def fetch(client, url):
+    """GET url, reading streamed content so it counts towards the time."""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise BenchmarkError(f"GET {url} returned {response.status_code}")
+    if response.streaming:
+        b"".join(response.streaming_content)
+    return response
+
+
+def measure(client, url, requests, warmup):
+    """
+    Request url warmup times untimed, then requests times, and return the
+    latency percentiles, queries per request and serial throughput.
+    """
+    for _ in range(warmup):
+        fetch(client, url)
+
+    timings = []
+    queries = []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            fetch(client, url)
+            timings.append(time.perf_counter() - start)
+        queries.append(len(captured))
+
+    return {
+        "url": url,
+        "requests": requests,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "queries": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+        "throughput_rps": round(len(timings) / sum(timings), 2),
+    }
+
+
+def git_commit():
+    """Return the current git commit of the project, or None outside a checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def environment():
+    """Describe where the benchmark ran, so reports can be told apart."""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+    }
+
+
+def compare(report, baseline):
+    """
+    Yield (scenario, size, name, baseline p50, p50, speedup) for every view
+    present in both reports.
+    """
+    old = {
+        (run["scenario"], run["size"], name): view
+        for run in baseline["runs"]
+        for name, view in run["views"].items()
+    }
+    for run in report["runs"]:
+        for name, view in run["views"].items():
+            before = old.get((run["scenario"], run["size"], name))
+            if before:
+                yield (
+                    run["scenario"],
+                    run["size"],
+                    name,
+                    before["p50_ms"],
+                    view["p50_ms"],
+                    round(before["p50_ms"] / view["p50_ms"], 2),
+                )
@@ -0,0 +1,264 @@
+# benchmarks/management/commands/benchmark.py
+# management command to benchmark the hot views of every application
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/23/2025
+
+import json
+import random
+import time
+from urllib.parse import urlencode
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from benchmarks.harness import BenchmarkError, compare, environment, measure
+from benchmarks.seeds import seed_attendance, seed_results, seed_social, seed_voters
+from voter_analytics.models import Voter
+from marathon_analytics.models import Result
+
+SCENARIOS = ["voters", "marathon", "mini_insta", "attendance"]
+VOTER_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS = 50_000
+PROFILES = 2_000
+FOLLOWS = 100_000
+LIKES = 1_000_000
+STUDENTS = 300
+WEEKS = 15
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic datasets into a throwaway test database, drive the hot "
+        "views of every application through the test client and report p50/p99 "
+        "latency, queries per request and throughput as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            nargs="+",
+            choices=SCENARIOS,
+            default=SCENARIOS,
+            help="applications to benchmark (default all)",
+        )
+        parser.add_argument(
+            "--voters",
+            nargs="+",
+            type=int,
+            default=VOTER_SIZES,
+            help="voter table sizes to benchmark, seeded in increasing steps",
+        )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="multiply every dataset size, e.g. 0.01 for a quick run",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=50, help="timed requests per view"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=3, help="untimed requests per view"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=412, help="random seed for the datasets"
+        )
+        parser.add_argument("--output", help="write the JSON report to this file")
+        parser.add_argument(
+            "--baseline", help="earlier JSON report to print p50 speedups against"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["warmup"] < 0:
+            raise CommandError("--requests must be positive and --warmup not negative")
+        if options["scale"] <= 0:
+            raise CommandError("--scale must be positive")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(e)
+
+        self.options = options
+        self.rng = random.Random(options["seed"])
+
+        # everything is seeded into a fresh test database, never the real one
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            runs = []
+            for scenario in options["scenario"]:
+                cache.clear()
+                runs.extend(getattr(self, f"run_{scenario}")())
+        except BenchmarkError as e:
+            raise CommandError(e)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "environment": environment(),
+            "options": {
+                key: options[key]
+                for key in ["scenario", "voters", "scale", "requests", "warmup", "seed"]
+            },
+            "runs": runs,
+        }
+
+        if baseline:
+            for scenario, size, name, before, after, speedup in compare(
+                report, baseline
+            ):
+                self.progress(
+                    f"{scenario} {size} {name}: p50 {before} -> {after} ms ({speedup}x)"
+                )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def scaled(self, size):
+        """Return size multiplied by --scale, at least 1."""
+        return max(1, int(size * self.options["scale"]))
+
+    def progress(self, message):
+        """Report progress on stderr so stdout stays valid JSON."""
+        if self.options["verbosity"] > 0:
+            self.stderr.write(message, self.style.HTTP_INFO)
+
+    def seed(self, scenario, size, seeder, *args):
+        """Run seeder(*args), returning its result and how long it took."""
+        self.progress(f"Seeding {scenario} ({size})")
+        start = time.perf_counter()
+        seeded = seeder(*args)
+        return seeded, round(time.perf_counter() - start, 3)
+
+    def run(self, scenario, size, seed_seconds, client, views):
+        """Measure every view in views, a dict of name to URL."""
+        results = {}
+        for name, url in views.items():
+            self.progress(f"Benchmarking {scenario} ({size}) {name}: {url}")
+            results[name] = measure(
+                client, url, self.options["requests"], self.options["warmup"]
+            )
+        return {
+            "scenario": scenario,
+            "size": size,
+            "seed_seconds": seed_seconds,
+            "views": results,
+        }
+
+    def run_voters(self):
+        """Benchmark the voter list, graphs and detail pages at each size."""
+        client = Client()
+        seeded = 0
+        for size in sorted(set(self.scaled(size) for size in self.options["voters"])):
+            _, seconds = self.seed("voters", size, seed_voters, size, self.rng, seeded)
+            seeded = size
+            voter = Voter.objects.order_by("pk")[size // 2]
+            party = urlencode({"party_affiliation": "D ", "min_dob": 1960})
+            elections = urlencode({"v20state": "on", "v22general": "on"})
+            yield self.run(
+                "voters",
+                size,
+                seconds,
+                client,
+                {
+                    "list": "/voter_analytics/",
+                    "list_filtered": f"/voter_analytics/?{party}",
+                    "list_elections": f"/voter_analytics/?{elections}",
+                    "graphs": "/voter_analytics/graphs",
+                    "graphs_filtered": f"/voter_analytics/graphs?{party}",
+                    "detail": f"/voter_analytics/voter/{voter.pk}",
+                },
+            )
+
+    def run_marathon(self):
+        """Benchmark the marathon results list and detail pages."""
+        size = self.scaled(RESULTS)
+        _, seconds = self.seed("marathon", size, seed_results, size, self.rng)
+        result = Result.objects.order_by("place_overall")[size // 2]
+        yield self.run(
+            "marathon",
+            size,
+            seconds,
+            Client(),
+            {
+                "list": "/marathon_analytics/results",
+                "list_city": "/marathon_analytics/results?city=Chicago",
+                "detail": f"/marathon_analytics/result/{result.pk}",
+            },
+        )
+
+    def run_mini_insta(self):
+        """Benchmark the feed, profile, post and search pages of a busy graph."""
+        profiles = self.scaled(PROFILES)
+        likes = self.scaled(LIKES)
+        seeded, seconds = self.seed(
+            "mini_insta",
+            likes,
+            seed_social,
+            profiles,
+            self.scaled(FOLLOWS),
+            likes,
+            self.rng,
+        )
+        reader = seeded[0]
+        post = reader.post_set.order_by("pk").first()
+        client = Client()
+        client.force_login(reader.user)
+        yield self.run(
+            "mini_insta",
+            likes,
+            seconds,
+            client,
+            {
+                "feed": "/mini_insta/profile/feed",
+                "profile": f"/mini_insta/profile/{reader.pk}",
+                "post": f"/mini_insta/post/{post.pk}",
+                "search": "/mini_insta/profile/search?query=sunset",
+            },
+        )
+
+    def run_attendance(self):
+        """Benchmark a term of attendance for a student and the instructor."""
+        students = self.scaled(STUDENTS)
+        (instructor, profiles), seconds = self.seed(
+            "attendance", students, seed_attendance, students, WEEKS, self.rng
+        )
+
+        student = Client()
+        student.force_login(profiles[0].user)
+        yield self.run(
+            "attendance_student",
+            students,
+            seconds,
+            student,
+            {
+                "home": "/attendance/profile",
+                "history": "/attendance/profile/attendance",
+            },
+        )
+
+        staff = Client()
+        staff.force_login(instructor.user)
+        yield self.run(
+            "attendance_instructor",
+            students,
+            seconds,
+            staff,
+            {
+                "report": "/attendance/profile/student_attendance",
+                "appeals": "/attendance/profile/handle_appeal",
+                "export_csv": "/attendance/export_csv",
+            },
+        )
@@ -0,0 +1,304 @@
+# benchmarks/seeds.py
+# deterministic synthetic datasets for the benchmark harness
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/23/2025
+
+from datetime import date, time, timedelta
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from cs412.importing import batches
+from marathon_analytics.models import Result
+from marathon_analytics.passing import compute_passing
+from mini_insta.models import (
+    Comment,
+    Follow,
+    Like,
+    Photo,
+    Post,
+    Profile,
+    counters_enabled,
+    rebuild_stats,
+    timelines_enabled,
+)
+from mini_insta.timelines import rebuild_timelines
+from voter_analytics.importer import ELECTIONS, content_hash
+from voter_analytics.models import Voter
+from voter_analytics.models import bump_data_version as bump_voters_version
+from attendance.models import (
+    Appeal,
+    Attend,
+    Class,
+    get_sections,
+    rebuild_rollups,
+    rollups_enabled,
+)
+from attendance.models import Profile as AttendanceProfile
+
+BATCH_SIZE = 2000
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Casey", "Riley", "Morgan", "Avery"]
+LAST_NAMES = ["Smith", "Chen", "Garcia", "Nguyen", "Patel", "Kim", "Brown", "Lee"]
+STREETS = ["Walnut St", "Centre St", "Beacon St", "Washington St", "Lowell Ave"]
+PARTIES = ["U ", "D ", "R ", "J ", "L ", "Q ", "A ", "CC"]
+PARTY_WEIGHTS = [50, 30, 10, 3, 2, 2, 2, 1]
+CITIES = ["Chicago", "Evanston", "Boston", "Denver", "Toronto", "London"]
+WORDS = ["sunset", "coffee", "campus", "marathon", "boston", "snow", "music", "cat"]
+
+TERM_START = date(2025, 9, 1)
+
+
+def bulk_insert(model, objects):
+    """Insert objects in batches inside one transaction."""
+    with transaction.atomic():
+        for batch in batches(objects, BATCH_SIZE):
+            model.objects.bulk_create(batch)
+
+
+def create_users(prefix, count):
+    """Create count Users with unusable passwords, returned in order."""
+    bulk_insert(
+        User,
+        (User(username=f"{prefix}{i}", password="!") for i in range(count)),
+    )
+    return list(User.objects.filter(username__startswith=prefix).order_by("pk"))
+
+
+def seed_voters(count, rng, start=0):
+    """Add voters numbered start to count - 1, so sizes can grow in steps."""
+
+    def voters():
+        for i in range(start, count):
+            born = date(1930, 1, 1) + timedelta(days=rng.randrange(75 * 365))
+            voted = [rng.random() < 0.4 for _ in ELECTIONS]
+            voter = Voter(
+                voter_id=f"B{i:011d}",
+                last_name=rng.choice(LAST_NAMES),
+                first_name=rng.choice(FIRST_NAMES),
+                residential_address=f"{rng.randrange(1, 400)} {rng.choice(STREETS)}",
+                date_of_birth=born,
+                birth_year=born.year,
+                date_of_registration=born + timedelta(days=18 * 365),
+                party_affiliation=rng.choices(PARTIES, PARTY_WEIGHTS)[0],
+                precinct_number=f"{rng.randrange(1, 9)}{rng.choice('ABCD')}",
+                voter_score=sum(voted),
+                **dict(zip(ELECTIONS, voted)),
+            )
+            voter.content_hash = content_hash(voter)
+            yield voter
+
+    bulk_insert(Voter, voters())
+    bump_voters_version()
+
+
+def seed_results(count, rng):
+    """Add count marathon results with start waves and plausible splits."""
+
+    def seconds(value):
+        return time(value // 3600, value // 60 % 60, value % 60)
+
+    finishes = sorted(rng.randrange(2 * 3600, 6 * 3600) for _ in range(count))
+
+    def results():
+        for place, finish in enumerate(finishes, start=1):
+            start = 7 * 3600 + 30 * 60 + rng.randrange(4) * 15 * 60
+            half = int(finish * rng.uniform(0.45, 0.52))
+            yield Result(
+                bib=place,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                ctz="USA",
+                city=rng.choice(CITIES),
+                state="IL",
+                gender=rng.choice(["M", "F"]),
+                division=rng.choice(["18-24", "25-29", "30-34", "35-39", "40-44"]),
+                place_overall=place,
+                place_gender=place,
+                place_division=place,
+                start_time_of_day=seconds(start),
+                finish_time_of_day=seconds(start + finish),
+                time_finish=seconds(finish),
+                time_half1=seconds(half),
+                time_half2=seconds(finish - half),
+            )
+
+    bulk_insert(Result, results())
+    compute_passing()
+
+
+def seed_social(profiles, follows, likes, rng, posts_per_profile=10):
+    """
+    Add a mini_insta social graph: profiles with posts, photos and comments,
+    about follows Follow rows and likes Like rows spread over the posts.
+    Return the Profiles in order.
+    """
+    users = create_users("insta", profiles)
+    bulk_insert(
+        Profile,
+        (
+            Profile(
+                username=user.username,
+                display_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                profile_image_url="https://example.com/profile.png",
+                bio_text=" ".join(rng.sample(WORDS, 3)),
+                user=user,
+            )
+            for user in users
+        ),
+    )
+    profile_pks = list(Profile.objects.order_by("pk").values_list("pk", flat=True))
+
+    per_profile = min(follows // profiles, profiles - 1)
+    bulk_insert(
+        Follow,
+        (
+            Follow(profile_id=followed, follower_profile_id=follower)
+            for follower in profile_pks
+            for followed in rng.sample(profile_pks, per_profile + 1)
+            if followed != follower
+        ),
+    )
+
+    bulk_insert(
+        Post,
+        (
+            Post(profile_id=pk, caption=" ".join(rng.sample(WORDS, 4)))
+            for pk in profile_pks
+            for _ in range(posts_per_profile)
+        ),
+    )
+    post_pks = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+    bulk_insert(
+        Photo,
+        (
+            Photo(post_id=pk, image_url="https://example.com/photo.png")
+            for pk in post_pks
+        ),
+    )
+    bulk_insert(
+        Comment,
+        (
+            Comment(post_id=pk, profile_id=rng.choice(profile_pks), text="nice")
+            for pk in post_pks
+            for _ in range(3)
+        ),
+    )
+
+    per_post = min(likes // len(post_pks), profiles)
+    bulk_insert(
+        Like,
+        (
+            Like(post_id=pk, profile_id=liker)
+            for pk in post_pks
+            for liker in rng.sample(profile_pks, per_post)
+        ),
+    )
+
+    if counters_enabled():
+        rebuild_stats()
+    if timelines_enabled():
+        rebuild_timelines()
+
+    return list(Profile.objects.order_by("pk"))
+
+
+def seed_attendance(students, weeks, rng, attendance_rate=0.85):
+    """
+    Add a term of attendance for the registered sections: lectures on
+    Mondays, Wednesdays and Fridays, weekly discussions, students split
+    across the sections, their sign-ins, and appeals for some missed
+    sessions. A session for the first lecture is placed at the current time
+    so the sign-in pages see a class happening.
+    Return (instructor, students) Profiles.
+    """
+    sections = get_sections().values()
+    lectures = [section for section in sections if section.kind == "lecture"]
+    discussions = [section for section in sections if section.kind == "discussion"]
+
+    classes = []
+    for week in range(weeks):
+        monday = TERM_START + timedelta(weeks=week)
+        for section in lectures:
+            for day in (0, 2, 4):
+                classes.append((section, monday + timedelta(days=day)))
+        for section in discussions:
+            classes.append((section, monday + timedelta(days=3)))
+
+    bulk_insert(
+        Class,
+        (
+            Class(
+                name=section.name,
+                session_time=section.get_session_time(day),
+                answer=str(rng.randrange(1, 11)),
+                latitude=section.latitude,
+                longitude=section.longitude,
+            )
+            for section, day in classes
+        ),
+    )
+    Class.objects.create(
+        name=lectures[0].name,
+        session_time=timezone.now(),
+        answer="1",
+        latitude=lectures[0].latitude,
+        longitude=lectures[0].longitude,
+    )
+
+    users = create_users("attendance", students + 1)
+    instructor = AttendanceProfile.objects.create(
+        first_name="Ada", last_name="Instructor", is_instructor=True, user=users[0]
+    )
+    bulk_insert(
+        AttendanceProfile,
+        (
+            AttendanceProfile(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                is_instructor=False,
+                lecture=lectures[i % len(lectures)].name,
+                discussion=discussions[i % len(discussions)].name,
+                user=user,
+            )
+            for i, user in enumerate(users[1:])
+        ),
+    )
+    profiles = list(
+        AttendanceProfile.objects.filter(is_instructor=False).order_by("pk")
+    )
+
+    sessions = {}
+    past = Class.objects.filter(session_time__lt=timezone.now() - timedelta(hours=1))
+    for session in past:
+        sessions.setdefault(session.name, []).append(session)
+
+    attends, appeals = [], []
+    for profile in profiles:
+        for session in sessions.get(profile.lecture, []) + sessions.get(
+            profile.discussion, []
+        ):
+            if rng.random() < attendance_rate:
+                attends.append(
+                    Attend(
+                        student=profile,
+                        session=session,
+                        answer=session.answer,
+                        latitude=session.latitude,
+                        longitude=session.longitude,
+                        status="attended",
+                    )
+                )
+            elif rng.random() < 0.3:
+                appeals.append(
+                    Appeal(
+                        student=profile,
+                        session=session,
+                        reason="GPS did not work",
+                        status="submitted",
+                    )
+                )
+    bulk_insert(Attend, attends)
+    bulk_insert(Appeal, appeals)
+    if rollups_enabled():
+        rebuild_rollups()
+
+    return instructor, profiles
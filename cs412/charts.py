@@ -0,0 +1,48 @@
+# cs412/charts.py
+# Plotly chart rendering shared by the analytics applications
+
+import hashlib
+import plotly
+from django.core.cache import cache
+
+# how long a rendered chart stays cached, in seconds
+CHART_TIMEOUT = 60 * 60
+
+
+def chart_cache_key(name, version, params=None):
+    """
+    Return a cache key for charts called name, built from the data version
+    and the non-empty request parameters (ignoring the page number). Pass
+    the version shared by every process (see cs412.versions), so reloading
+    the data in one process stops every worker serving the old charts.
+    """
+    normalized = []
+    if params is not None:
+        normalized = sorted(
+            (key, value)
+            for key, values in params.lists()
+            if key != "page"
+            for value in values
+            if value
+        )
+    digest = hashlib.sha1(repr(normalized).encode()).hexdigest()
+    return f"charts:{name}:{version}:{digest}"
+
+
+def render_chart(figure):
+    """
+    Render a Plotly figure as an HTML div holding only the figure JSON.
+    plotly.js itself is loaded once per page from static/plotly/plotly.min.js.
+    """
+    return plotly.offline.plot(
+        figure, auto_open=False, output_type="div", include_plotlyjs=False
+    )
+
+
+def cached_charts(key, build):
+    """Return the dict of rendered charts cached under key, calling build() on a miss."""
+    charts = cache.get(key)
+    if charts is None:
+        charts = build()
+        cache.set(key, charts, CHART_TIMEOUT)
+    return charts
@@ -0,0 +1,20 @@
+# cs412/importing.py
+# helpers shared by the CSV importers of the analytics applications
+
+from itertools import islice
+
+
+def batches(iterable, size):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def delete_rows(queryset):
+    """
+    Delete the rows of queryset in one DELETE statement, without loading
+    them or sending post_delete for each one. Only for models no other
+    table references; the importers bump the data version once instead.
+    """
+    return queryset._raw_delete(queryset.db)
@@ -0,0 +1,158 @@
+# cs412/pagination.py
+# keyset (seek) pagination for ListViews over large tables
+
+import hashlib
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+# how long a paginator's total count stays cached, in seconds
+COUNT_TIMEOUT = 5 * 60
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated list, with the cursors of its first and
+    last rows for linking to the previous and next pages.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, previous_cursor, next_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset ordered by (ordering, pk) using cursors instead of
+    OFFSET. A page is fetched with a range condition on the last row seen,
+    so every page costs the same as the first one. The total count is
+    computed at most once per COUNT_TIMEOUT and shared through the cache.
+    """
+
+    def __init__(self, queryset, per_page, ordering="pk", count_timeout=COUNT_TIMEOUT):
+        self.per_page = per_page
+        self.count_timeout = count_timeout
+        self.keys = ["pk"] if ordering in ("pk", "id") else [ordering, "pk"]
+        self.fields = [
+            (
+                queryset.model._meta.pk
+                if key == "pk"
+                else queryset.model._meta.get_field(key)
+            )
+            for key in self.keys
+        ]
+        self.queryset = queryset.order_by(*self.keys)
+
+    @property
+    def count(self):
+        """Return the total number of rows, cached for count_timeout seconds."""
+        if self.count_timeout is None:
+            return self.queryset.count()
+        query = str(self.queryset.query).encode()
+        key = f"keyset_count:{hashlib.sha1(query).hexdigest()}"
+        return cache.get_or_set(key, self.queryset.count, self.count_timeout)
+
+    def encode(self, obj):
+        """Return the cursor for obj."""
+        return ":".join(str(getattr(obj, key)) for key in self.keys)
+
+    def decode(self, cursor):
+        """Return the key values in cursor, or raise InvalidPage."""
+        parts = cursor.rsplit(":", len(self.keys) - 1)
+        if len(parts) != len(self.keys):
+            raise InvalidPage("Invalid cursor")
+        try:
+            return [field.to_python(part) for field, part in zip(self.fields, parts)]
+        except ValidationError:
+            raise InvalidPage("Invalid cursor")
+
+    def seek(self, values, direction):
+        """
+        Return the queryset limited to rows after (direction "gt") or before
+        (direction "lt") the row with the given key values.
+        """
+        if len(self.keys) == 1:
+            return self.queryset.filter(**{f"pk__{direction}": values[0]})
+
+        ordering, value = self.keys[0], values[0]
+        # the first condition lets the database range-scan the ordering index
+        return self.queryset.filter(**{f"{ordering}__{direction}e": value}).filter(
+            Q(**{f"{ordering}__{direction}": value})
+            | Q(**{ordering: value, f"pk__{direction}": values[1]})
+        )
+
+    def page(self, after=None, before=None):
+        """Return the page following the after cursor or preceding the before cursor."""
+        if before:
+            rows = self.seek(self.decode(before), "lt").reverse()
+        elif after:
+            rows = self.seek(self.decode(after), "gt")
+        else:
+            rows = self.queryset
+
+        rows = list(rows[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if before:
+            rows.reverse()
+            has_previous, has_next = more, True
+        else:
+            has_previous, has_next = bool(after), more
+
+        return KeysetPage(
+            rows,
+            self,
+            self.encode(rows[0]) if rows and has_previous else None,
+            self.encode(rows[-1]) if rows and has_next else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that paginates with a KeysetPaginator ordered by
+    keyset_ordering. Pages are selected with the after/before URL parameters.
+    Set keyset_ordering to None to fall back to Django's OFFSET pagination.
+    """
+
+    keyset_ordering = "pk"
+
+    def get_keyset_ordering(self):
+        """Return the field pages are ordered by, or None for OFFSET pagination."""
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering()
+        if ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
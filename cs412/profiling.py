@@ -0,0 +1,168 @@
+# cs412/profiling.py
+# per-request query counting, timing and query budgets for every application
+
+import json
+import logging
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("cs412.profiling")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more queries than its declared query_budget"""
+
+
+def query_budget(budget):
+    """Declare the most queries a function view may run per request"""
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+
+    return decorator
+
+
+def get_query_budget(view_func):
+    """Return the query_budget declared on a function or class-based view, or None"""
+    view_class = getattr(view_func, "view_class", None)
+    return getattr(view_class or view_func, "query_budget", None)
+
+
+class QueryRecorder:
+    """Database execute wrapper recording every SQL statement and its duration"""
+
+    def __init__(self):
+        self.statements = Counter()
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Return the number of statements that repeated an earlier one"""
+        return self.count - len(self.statements)
+
+
+class ProfilingMiddleware:
+    """
+    Record the query count, SQL time, duplicate queries, template render
+    time and peak traced memory of each request when REQUEST_PROFILING is
+    on. The numbers are logged as one JSON line on the cs412.profiling
+    logger and sent back in a Server-Timing header.
+
+    Views may declare query_budget (see query_budget()). A request over
+    budget is logged as a warning, and raises QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is on, which makes the test client fail.
+
+    A streaming response runs its queries while it is sent, so it is
+    counted until its content is exhausted. Its headers are already gone
+    by then, so it gets no Server-Timing header, and a strict budget
+    raises while the content is read.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profiling = getattr(settings, "REQUEST_PROFILING", False)
+        strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+        if not (profiling or strict):
+            return self.get_response(request)
+
+        if profiling:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        recorder = QueryRecorder()
+        request._query_budget = None
+        request._template_time = 0.0
+        start = time.perf_counter()
+
+        with self.recording(recorder):
+            response = self.get_response(request)
+
+        if response.streaming:
+            content = response.streaming_content
+
+            def counted():
+                with self.recording(recorder):
+                    yield from content
+                self.finish(request, response, recorder, start, profiling, strict)
+
+            response.streaming_content = counted()
+            return response
+
+        self.finish(request, response, recorder, start, profiling, strict)
+        return response
+
+    def recording(self, recorder):
+        """Return a context manager passing the queries of every database to recorder"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def finish(self, request, response, recorder, start, profiling, strict):
+        """Log the numbers of a finished request and enforce its query budget"""
+        total = time.perf_counter() - start
+        stats = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "duplicate_queries": recorder.duplicates,
+            "sql_ms": round(recorder.duration * 1000, 2),
+            "template_ms": round(request._template_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "query_budget": request._query_budget,
+        }
+
+        if profiling:
+            stats["peak_memory_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            logger.info(json.dumps(stats))
+            if not response.streaming:
+                response["Server-Timing"] = ", ".join(
+                    [
+                        f'db;dur={stats["sql_ms"]};desc="{recorder.count} queries"',
+                        f'tpl;dur={stats["template_ms"]}',
+                        f'total;dur={stats["total_ms"]}',
+                    ]
+                )
+
+        budget = request._query_budget
+        if budget is not None and recorder.count > budget:
+            message = (
+                f"{request.method} {request.path} ran {recorder.count} queries, "
+                f"over its budget of {budget} ({recorder.duplicates} duplicates)"
+            )
+            if strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, "_query_budget"):
+            request._query_budget = get_query_budget(view_func)
+
+    def process_template_response(self, request, response):
+        if hasattr(request, "_template_time"):
+            start = time.perf_counter()
+
+            def rendered(response):
+                request._template_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "dadjokes",
     "attendance",
+    "benchmarks",
 ]
 
 MIDDLEWARE = [
@@ -59,6 +61,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "cs412.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "cs412.urls"
@@ -139,6 +142,13 @@ STATIC_URL = "static/"  # note: no leading slash!
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
+    # serve the plotly.js bundle shipped with the plotly package as static/plotly/
+    (
+        "plotly",
+        os.path.join(
+            os.path.dirname(importlib.util.find_spec("plotly").origin), "package_data"
+        ),
+    ),
 ]
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
@@ -151,3 +161,52 @@ CS_DEPLOYMENT_HOSTNAME = "cs-webapps.bu.edu"
 if socket.gethostname() == CS_DEPLOYMENT_HOSTNAME:
     STATIC_URL = "/harrydm/static/"
     MEDIA_URL = "/harrydm/media/"
+
+# cached values live in each process; the "versions" cache holds the data
+# version tokens on disk, so a data load or admin edit in any process
+# invalidates the caches of every worker
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "cache", "versions"),
+    },
+}
+
+# answer voter_analytics searches and graphs from the in-memory VoterCube
+VOTER_CUBE = True
+
+# maintain the mini_insta ProfileStats/PostStats counter tables on writes
+# (run `manage.py rebuild_stats` after turning this on)
+MINI_INSTA_COUNTERS = False
+
+# build mini_insta feeds from fan-out-on-write timelines
+# (run `manage.py rebuild_timelines` after turning this on)
+MINI_INSTA_TIMELINES = False
+
+# worker threads resizing uploaded mini_insta photos (0 resizes during the request)
+MINI_INSTA_IMAGE_WORKERS = 2
+
+# milliseconds attendance sign-ins wait to be written together in one batch
+# (0 writes each sign-in during its request)
+ATTENDANCE_SIGNIN_BATCH_MS = 0
+
+# maintain and read the attendance ParticipationRollup table
+# (run `manage.py rebuild_rollups` after turning this on)
+ATTENDANCE_ROLLUPS = False
+
+# log query counts and timings of every request, with Server-Timing headers
+REQUEST_PROFILING = False
+
+# raise instead of warn when a view runs more queries than its query_budget
+# (turn on in tests)
+QUERY_BUDGET_STRICT = False
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "cs412.profiling": {"handlers": ["console"], "level": "INFO"},
+    },
+}
@@ -0,0 +1,15 @@
+# cs412/versions.py
+# data version tokens shared by every worker process
+
+import time
+from django.core.cache import caches
+
+
+def get_version(key):
+    """Return the version token stored under key, starting one if there is none."""
+    return caches["versions"].get_or_set(key, time.time_ns, None)
+
+
+def bump_version(key):
+    """Replace the version token under key, invalidating caches built from it."""
+    caches["versions"].set(key, time.time_ns(), None)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MarathonAnalyticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "marathon_analytics"
+
+    def ready(self):
+        # connect the cache invalidation signal handlers
+        from . import signals
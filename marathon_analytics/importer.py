@@ -0,0 +1,110 @@
+# marathon_analytics/importer.py
+# streaming CSV importer for the marathon analytics application
+
+import csv
+from functools import lru_cache
+from django.db import transaction
+from django.utils.dateparse import parse_time
+from cs412.importing import batches, delete_rows
+from .models import Result
+from .passing import compute_passing
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+@lru_cache(maxsize=None)
+def parse_cached_time(value):
+    """
+    Convert an H:MM:SS column of the CSV to a time.
+    Runners share start waves and finish seconds, so the cache turns most
+    of the parsing into dictionary lookups.
+    """
+    parsed = parse_time(value.strip())
+    if parsed is None:
+        raise ValueError(f"invalid time {value!r}")
+    return parsed
+
+
+def parse_result(fields):
+    """Build an unsaved Result from one row of the Chicago results CSV."""
+    if len(fields) < 16:
+        raise ValueError(f"expected 16 columns, got {len(fields)}")
+
+    return Result(
+        bib=int(fields[0]),
+        first_name=fields[1],
+        last_name=fields[2],
+        ctz=fields[3],
+        city=fields[4],
+        state=fields[5],
+        gender=fields[6],
+        division=fields[7],
+        place_overall=int(fields[8]),
+        place_gender=int(fields[9]),
+        place_division=int(fields[10]),
+        start_time_of_day=parse_cached_time(fields[11]),
+        finish_time_of_day=parse_cached_time(fields[12]),
+        time_finish=parse_cached_time(fields[13]),
+        time_half1=parse_cached_time(fields[14]),
+        time_half2=parse_cached_time(fields[15]),
+    )
+
+
+def read_results(filename, rejects):
+    """
+    Yield unsaved Results from the CSV file one row at a time.
+    Rows that cannot be parsed are passed to rejects(line number, row, error).
+    """
+    with open(filename, "r", newline="") as f:
+        reader = csv.reader(f)
+
+        # discard headers
+        next(reader, None)
+
+        for fields in reader:
+            try:
+                yield parse_result(fields)
+            except ValueError as e:
+                rejects(reader.line_num, fields, e)
+
+
+def load_results(
+    filename, rejects_filename=None, batch_size=DEFAULT_BATCH_SIZE, progress=None
+):
+    """
+    Replace the Result table with the records in filename.
+    Rows are written with bulk_create, one transaction per batch.
+    Runners passed/passed by are precomputed once the table is loaded.
+    Rejected rows are written to rejects_filename (default: filename with a
+    .rejects.csv suffix) along with their line number and error.
+    progress, if given, is called as progress(created, rejected) after each batch.
+    Return the number of results created and the number of rejected rows.
+    """
+    if rejects_filename is None:
+        rejects_filename = f"{filename}.rejects.csv"
+
+    created = 0
+    rejected = 0
+
+    with open(rejects_filename, "w", newline="") as rejects_file:
+        writer = csv.writer(rejects_file)
+        writer.writerow(["line", "error", "row"])
+
+        def reject(line_num, fields, error):
+            nonlocal rejected
+            rejected += 1
+            writer.writerow([line_num, error, ",".join(fields)])
+
+        delete_rows(Result.objects.all())
+
+        for batch in batches(read_results(filename, reject), batch_size):
+            with transaction.atomic():
+                Result.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+
+            if progress:
+                progress(created, rejected)
+
+    parse_cached_time.cache_clear()
+    compute_passing(batch_size)
+    return created, rejected
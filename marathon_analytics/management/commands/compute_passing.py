@@ -0,0 +1,13 @@
+# marathon_analytics/management/commands/compute_passing.py
+# management command to precompute runners passed/passed by for every result
+
+from django.core.management.base import BaseCommand
+from marathon_analytics.passing import compute_passing
+
+
+class Command(BaseCommand):
+    help = "Precompute how many runners each runner passed and was passed by."
+
+    def handle(self, *args, **options):
+        updated = compute_passing()
+        self.stdout.write(self.style.SUCCESS(f"Done. Updated {updated} Results"))
@@ -0,0 +1,43 @@
+# marathon_analytics/management/commands/load_results.py
+# management command to load the Chicago marathon results CSV into the database
+
+from django.core.management.base import BaseCommand, CommandError
+from marathon_analytics.importer import DEFAULT_BATCH_SIZE, load_results
+
+
+class Command(BaseCommand):
+    help = "Load runner results from the Chicago marathon results CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("filename", help="path to the results CSV file")
+        parser.add_argument(
+            "--rejects",
+            help="where to write rejected rows (default: FILENAME.rejects.csv)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"rows per bulk insert (default {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        def progress(created, rejected):
+            self.stdout.write(f"Imported {created} results ({rejected} rejected)")
+
+        try:
+            created, rejected = load_results(
+                options["filename"],
+                options["rejects"],
+                options["batch_size"],
+                progress,
+            )
+        except OSError as e:
+            raise CommandError(e)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Done. Created {created} Results, rejected {rejected}")
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2025-12-14 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marathon_analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="result",
+            name="runners_passed",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="result",
+            name="runners_passed_by",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
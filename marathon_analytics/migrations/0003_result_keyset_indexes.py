@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2025-12-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marathon_analytics", "0002_result_runners_passed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(fields=["place_overall", "id"], name="result_place_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(
+                fields=["city", "place_overall", "id"], name="result_city_place_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from cs412.versions import bump_version, get_version
+
+DATA_VERSION_KEY = "marathon_analytics:data_version"
 
 
 class Result(models.Model):
@@ -33,72 +36,62 @@ class Result(models.Model):
     time_half1 = models.TimeField()
     time_half2 = models.TimeField()
 
+    # precomputed by passing.compute_passing()
+    runners_passed = models.IntegerField(null=True, blank=True)
+    runners_passed_by = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination of the results list, with and without a city
+            models.Index(fields=["place_overall", "id"], name="result_place_idx"),
+            models.Index(
+                fields=["city", "place_overall", "id"], name="result_city_place_idx"
+            ),
+        ]
+
     def __str__(self):
         """Return a string representation of this model instance."""
         return f"{self.first_name} {self.last_name} ({self.city}, {self.state}), {self.time_finish}"
 
     def get_runners_passed(self):
         """Return the number of runners passed by this runner."""
+        if self.runners_passed is not None:
+            return self.runners_passed
+
         started_first = Result.objects.filter(
             start_time_of_day__lt=self.start_time_of_day
         )
         passed = started_first.filter(finish_time_of_day__gt=self.finish_time_of_day)
 
-        return len(passed)
+        return passed.count()
 
     def get_runners_passed_by(self):
         """Return the number of runners who passed this runner."""
+        if self.runners_passed_by is not None:
+            return self.runners_passed_by
+
         started_later = Result.objects.filter(
             start_time_of_day__gt=self.start_time_of_day
         )
         passed_by = started_later.filter(finish_time_of_day__lt=self.finish_time_of_day)
 
-        return len(passed_by)
+        return passed_by.count()
 
 
-def load_data():
+def get_data_version():
+    """Return a token that changes whenever the Result table changes."""
+    return get_version(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """Mark every cache derived from the Result table as stale."""
+    bump_version(DATA_VERSION_KEY)
+
+
+def load_data(filename, batch_size=2000):
     """Funtion to load data records from csv file into Django database"""
+    from .importer import load_results
+
+    created, rejected = load_results(filename, batch_size=batch_size)
 
-    Result.objects.all().delete()
-
-    filename = "/Users/apple/django/2023_chicago_results.csv"
-    f = open(filename, "r")  # open the file for reading
-
-    # discard headers
-    f.readline()
-
-    # read several rows
-    for line in f:
-        fields = line.strip().split(",")
-        # print(fields)
-        # for j in range(len(fields)):
-        #     print(f"fields[{j}] = {fields[j]}")
-
-        # create a new instance of Result object with this record from CSV
-        try:
-            result = Result(
-                bib=fields[0],
-                first_name=fields[1],
-                last_name=fields[2],
-                ctz=fields[3],
-                city=fields[4],
-                state=fields[5],
-                gender=fields[6],
-                division=fields[7],
-                place_overall=fields[8],
-                place_gender=fields[9],
-                place_division=fields[10],
-                start_time_of_day=fields[11],
-                finish_time_of_day=fields[12],
-                time_finish=fields[13],
-                time_half1=fields[14],
-                time_half2=fields[15],
-            )
-
-            result.save()
-
-        except:
-            print("Something went wrong:")
-            print(f"line={line}")
-
-    print(f"Done. Created {len(Result.objects.all())} Results")
+    print(f"Done. Created {created} Results, rejected {rejected}")
@@ -0,0 +1,96 @@
+# marathon_analytics/passing.py
+# precompute how many runners each runner passed and was passed by
+
+from django.db import transaction
+from .models import Result, bump_data_version
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class FenwickTree:
+    """Binary indexed tree of counts over positions 1..size."""
+
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+
+    def add(self, i):
+        """Count one more item at position i."""
+        while i < len(self.tree):
+            self.tree[i] += 1
+            i += i & -i
+
+    def prefix(self, i):
+        """Return the number of items at positions 1..i."""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+def count_passes(starts, finishes):
+    """
+    Given start and finish times of day for n runners, return two lists:
+    passed[i], the runners who started before i and finished after i, and
+    passed_by[i], the runners who started after i and finished before i.
+    Runs in O(n log n): runners are swept in start order, with a Fenwick
+    tree over finish ranks counting the runners already swept. Runners
+    with equal start times are counted together, so ties never pass.
+    """
+    n = len(starts)
+    finish_rank = {t: i + 1 for i, t in enumerate(sorted(set(finishes)))}
+    ranks = [finish_rank[t] for t in finishes]
+    order = sorted(range(n), key=lambda i: starts[i])
+
+    def sweep(order, count):
+        result = [0] * n
+        tree = FenwickTree(len(finish_rank))
+        swept = 0
+        g = 0
+        while g < n:
+            # one group of runners sharing a start time
+            h = g
+            while h < n and starts[order[h]] == starts[order[g]]:
+                h += 1
+            group = order[g:h]
+            for i in group:
+                result[i] = count(tree, swept, ranks[i])
+            for i in group:
+                tree.add(ranks[i])
+            swept += len(group)
+            g = h
+        return result
+
+    # earlier starters who finished later
+    passed = sweep(order, lambda tree, swept, r: swept - tree.prefix(r))
+    # later starters who finished earlier
+    passed_by = sweep(order[::-1], lambda tree, swept, r: tree.prefix(r - 1))
+    return passed, passed_by
+
+
+def compute_passing(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Store runners_passed and runners_passed_by for every Result.
+    Return the number of results updated.
+    """
+    rows = list(
+        Result.objects.values_list("pk", "start_time_of_day", "finish_time_of_day")
+    )
+    if not rows:
+        bump_data_version()
+        return 0
+
+    pks, starts, finishes = zip(*rows)
+    passed, passed_by = count_passes(starts, finishes)
+
+    results = [
+        Result(pk=pk, runners_passed=p, runners_passed_by=pb)
+        for pk, p, pb in zip(pks, passed, passed_by)
+    ]
+    with transaction.atomic():
+        Result.objects.bulk_update(
+            results, ["runners_passed", "runners_passed_by"], batch_size=batch_size
+        )
+    bump_data_version()
+
+    return len(results)
@@ -0,0 +1,13 @@
+# marathon_analytics/signals.py
+# signal handlers keeping the marathon_analytics caches current
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Result, bump_data_version
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, **kwargs):
+    """Rebuild the charts after a result is edited, added or deleted"""
+    bump_data_version()
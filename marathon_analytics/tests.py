@@ -1,3 +1,225 @@
-from django.test import TestCase
+import csv
+import os
+import random
+import shutil
+import tempfile
+from datetime import time
+from django.core.paginator import InvalidPage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from cs412.pagination import KeysetPaginator
+from .importer import load_results, parse_cached_time
+from .models import Result
+from .passing import compute_passing, count_passes
 
-# Create your tests here.
+
+def create_result(bib, start, finish, **fields):
+    """Create a Result for runner bib with the given start and finish times of day"""
+    values = {
+        "bib": bib,
+        "first_name": "Runner",
+        "last_name": str(bib),
+        "ctz": "",
+        "city": "Chicago",
+        "state": "IL",
+        "gender": "F",
+        "division": "F30-34",
+        "place_overall": bib,
+        "place_gender": bib,
+        "place_division": bib,
+        "start_time_of_day": start,
+        "finish_time_of_day": finish,
+        "time_finish": time(4, 0, 0),
+        "time_half1": time(1, 55, 0),
+        "time_half2": time(2, 5, 0),
+    }
+    values.update(fields)
+    return Result.objects.create(**values)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Check that the marathon pages stay within their query budgets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.results = [
+            create_result(bib, time(7, 30 + bib), time(11, 30 + bib % 3))
+            for bib in range(1, 6)
+        ]
+
+    def test_result_detail_within_budget(self):
+        # counting the passes is the slowest path, with nothing precomputed
+        response = self.client.get(reverse("result_detail", args=[self.results[2].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("graph_div_passed", response.context)
+
+    def test_results_list_within_budget(self):
+        response = self.client.get(reverse("results_list"), {"city": "Chicago"})
+        self.assertEqual(len(response.context["results"]), 5)
+
+
+class ChartVersionTests(TestCase):
+    """Check that cached charts are rebuilt after a result changes"""
+
+    def test_result_detail_rebuilt_after_edit(self):
+        result = create_result(1, time(7, 30), time(11, 30))
+        url = reverse("result_detail", args=[result.pk])
+        self.assertIn("Runner", self.client.get(url).context["graph_div_passed"])
+
+        result.first_name = "Renamed"
+        result.save()
+        self.assertIn("Renamed", self.client.get(url).context["graph_div_passed"])
+
+
+class PassingTests(TestCase):
+    """Check the Fenwick tree pass counts against a brute-force count"""
+
+    def brute_force(self, starts, finishes):
+        """Return (passed, passed_by) by comparing every pair of runners"""
+        n = len(starts)
+        passed = [
+            sum(starts[j] < starts[i] and finishes[j] > finishes[i] for j in range(n))
+            for i in range(n)
+        ]
+        passed_by = [
+            sum(starts[j] > starts[i] and finishes[j] < finishes[i] for j in range(n))
+            for i in range(n)
+        ]
+        return passed, passed_by
+
+    def test_matches_brute_force_with_ties(self):
+        rng = random.Random(412)
+        for n in [0, 1, 2, 10, 60]:
+            # few distinct times, so many runners tie on start and finish
+            starts = [time(7, rng.randrange(4)) for _ in range(n)]
+            finishes = [time(11, rng.randrange(4)) for _ in range(n)]
+            with self.subTest(n=n):
+                self.assertEqual(
+                    count_passes(starts, finishes), self.brute_force(starts, finishes)
+                )
+
+    def test_all_tied(self):
+        starts = [time(7, 30)] * 3
+        finishes = [time(11, 0)] * 3
+        self.assertEqual(count_passes(starts, finishes), ([0, 0, 0], [0, 0, 0]))
+
+    def test_stored_counts_match_queries(self):
+        times = [(0, 30), (0, 10), (5, 30), (5, 20), (9, 10)]
+        results = [
+            create_result(bib, time(7, start), time(11, finish))
+            for bib, (start, finish) in enumerate(times, 1)
+        ]
+        expected = [
+            (r.get_runners_passed(), r.get_runners_passed_by()) for r in results
+        ]
+
+        self.assertEqual(compute_passing(batch_size=2), len(results))
+        stored = Result.objects.order_by("bib").values_list(
+            "runners_passed", "runners_passed_by"
+        )
+        self.assertEqual(list(stored), expected)
+
+
+class KeysetPaginatorTests(TestCase):
+    """Check paging through results with cursors, ties included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # places tie in threes, so ties straddle the page boundaries
+        for bib in range(1, 11):
+            create_result(
+                bib, time(7, 30), time(11, 30), place_overall=(bib - 1) // 3 + 1
+            )
+        cls.expected = list(
+            Result.objects.order_by("place_overall", "pk").values_list("pk", flat=True)
+        )
+
+    def paginator(self):
+        return KeysetPaginator(
+            Result.objects.all(), 4, "place_overall", count_timeout=None
+        )
+
+    def test_forward_and_back(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+
+        self.assertEqual(
+            [[r.pk for r in page] for page in pages],
+            [self.expected[0:4], self.expected[4:8], self.expected[8:10]],
+        )
+        self.assertFalse(pages[0].has_previous())
+        self.assertFalse(pages[-1].has_next())
+        self.assertEqual(paginator.count, 10)
+
+        # the previous cursor of each page leads back to the page before it
+        for earlier, later in zip(pages, pages[1:]):
+            back = paginator.page(before=later.previous_cursor)
+            self.assertEqual(list(back), list(earlier))
+            self.assertTrue(back.has_next())
+            self.assertEqual(back.has_previous(), earlier.has_previous())
+
+    def test_malformed_cursor(self):
+        paginator = self.paginator()
+        for cursor in ["7", "x:1", "1:x"]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidPage):
+                    paginator.page(after=cursor)
+
+        response = self.client.get(reverse("results_list"), {"after": "x:1"})
+        self.assertEqual(response.status_code, 404)
+
+
+def result_row(bib, start="7:30:00", finish="11:45:10"):
+    """Return a row of the Chicago results CSV."""
+    return (
+        f"{bib},Alex,Smith,USA,Chicago,IL,F,F30-34,{bib},{bib},{bib},"
+        f"{start},{finish},4:15:10,2:05:00,2:10:10"
+    ).split(",")
+
+
+class ImporterTests(TestCase):
+    """Check that load_results replaces the results with the CSV rows"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_csv(self, rows):
+        filename = os.path.join(self.directory, "results.csv")
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["BIB"])
+            writer.writerows(rows)
+        return filename
+
+    def test_parse_time(self):
+        self.assertEqual(parse_cached_time(" 7:05:09 "), time(7, 5, 9))
+        self.assertEqual(parse_cached_time("11:45:10"), time(11, 45, 10))
+        with self.assertRaises(ValueError):
+            parse_cached_time("late")
+
+    def test_rejected_rows_are_written_out(self):
+        rows = [result_row(1), result_row(2, finish="late"), result_row(3)[:5]]
+        filename = self.write_csv(rows)
+
+        created, rejected = load_results(filename, batch_size=2)
+
+        self.assertEqual((created, rejected), (1, 2))
+        with open(f"{filename}.rejects.csv", newline="") as f:
+            rejects = list(csv.reader(f))
+        self.assertEqual([line for line, _, _ in rejects[1:]], ["3", "4"])
+        result = Result.objects.get()
+        self.assertEqual(result.finish_time_of_day, time(11, 45, 10))
+        self.assertEqual((result.runners_passed, result.runners_passed_by), (0, 0))
+
+    def test_reimport_replaces_results(self):
+        filename = self.write_csv([result_row(bib) for bib in range(1, 6)])
+        self.assertEqual(load_results(filename, batch_size=2), (5, 0))
+        self.assertEqual(load_results(filename, batch_size=2), (5, 0))
+        self.assertEqual(
+            list(Result.objects.order_by("bib").values_list("bib", flat=True)),
+            [1, 2, 3, 4, 5],
+        )
@@ -4,18 +4,21 @@ from typing import Any
 from django.db.models.query import QuerySet
 from django.shortcuts import render
 from django.views.generic import ListView, DetailView
-from .models import Result
-import plotly
+from cs412.pagination import KeysetPaginationMixin
+from cs412.charts import cached_charts, chart_cache_key, render_chart
+from .models import Result, get_data_version
 import plotly.graph_objs as go
 
 
-class ResultListView(ListView):
+class ResultListView(KeysetPaginationMixin, ListView):
     """View to display marathon results"""
 
     model = Result
     template_name = "marathon_analytics/results.html"
     context_object_name = "results"
     paginate_by = 25
+    keyset_ordering = "place_overall"
+    query_budget = 3
 
     def get_queryset(self):
         """limit the queryset"""
@@ -38,6 +41,7 @@ class ResultDetailView(DetailView):
     model = Result
     context_object_name = "r"
     template_name = "marathon_analytics/result_detail.html"
+    query_budget = 3
 
     def get_context_data(self, **kwargs):
         """
@@ -46,6 +50,20 @@ class ResultDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         r = context["r"]  # Result for one runner
 
+        # count the passes once for the graphs and the template alike
+        r.runners_passed = r.get_runners_passed()
+        r.runners_passed_by = r.get_runners_passed_by()
+
+        # the graphs only change when the results are reloaded
+        key = chart_cache_key(f"result_detail:{r.pk}", get_data_version())
+        context.update(cached_charts(key, lambda: self.get_graphs(r)))
+
+        return context
+
+    def get_graphs(self, r):
+        """Render the graphs for one runner's result as HTML divs"""
+        graphs = {}
+
         # create a graph of first hald/second half time as pie chart
         x = ["first half", "second half"]
         first_half_seconds = (
@@ -60,16 +78,13 @@ class ResultDetailView(DetailView):
         fig = go.Pie(labels=x, values=y)
         title_text = f"Half Marathon Splits"
         # obtain the graph as an HTML div"
-        graph_div_splits = plotly.offline.plot(
+        graph_div_splits = render_chart(
             {
                 "data": [fig],
                 "layout_title_text": title_text,
-            },
-            auto_open=False,
-            output_type="div",
+            }
         )
-        # send div as template context variable
-        context["graph_div_splits"] = graph_div_splits
+        graphs["graph_div_splits"] = graph_div_splits
 
         # create a bar chart with count of runners passed/passed by
         x = [f"Runners passed by {r.first_name}", f"Runners who passed {r.first_name}"]
@@ -78,14 +93,12 @@ class ResultDetailView(DetailView):
         fig = go.Bar(x=x, y=y)
         title_text = "Runners Passed/Passed By"
 
-        graph_div_passed = plotly.offline.plot(
+        graph_div_passed = render_chart(
             {
                 "data": [fig],
                 "layout_title_text": title_text,
-            },
-            auto_open=False,
-            output_type="div",
+            }
         )
-        context["graph_div_passed"] = graph_div_passed
+        graphs["graph_div_passed"] = graph_div_passed
 
-        return context
+        return graphs
@@ -0,0 +1,117 @@
+# mini_insta/images.py
+# resized image derivatives for uploaded mini_insta photos
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/22/2025
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# widths of the derivatives generated for every uploaded photo
+WIDTHS = [320, 640, 1080]
+
+# WebP where Pillow was built with it, JPEG otherwise
+FORMAT, EXTENSION = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+_executor = None
+
+
+def get_executor():
+    """Return the worker pool, or None to process photos synchronously"""
+    global _executor
+    workers = getattr(settings, "MINI_INSTA_IMAGE_WORKERS", 2)
+    if not workers:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(workers, thread_name_prefix="mini_insta-images")
+    return _executor
+
+
+def resize(image, width):
+    """Return image scaled down to width, encoded as FORMAT bytes"""
+    resized = image.copy()
+    resized.thumbnail((width, width * 10), Image.Resampling.LANCZOS)
+    if FORMAT == "JPEG" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    buffer = BytesIO()
+    resized.save(buffer, FORMAT, quality=80)
+    return buffer.getvalue()
+
+
+def make_derivatives(photo_id):
+    """
+    Write a resized copy of the photo's uploaded image at every width in
+    WIDTHS narrower than the original, and record their paths on the Photo.
+    Return False, after logging why, if the image could not be processed.
+    """
+    from .models import Photo
+
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is None or not photo.image_file:
+        return True
+
+    try:
+        with photo.image_file.open("rb") as f:
+            image = ImageOps.exif_transpose(Image.open(f))
+            image.load()
+    except (OSError, Image.DecompressionBombError):
+        # UnidentifiedImageError is an OSError; the upload keeps its original
+        logger.exception("Could not read the image of photo %s", photo_id)
+        return False
+
+    # replace any derivatives made earlier
+    delete_derivatives(photo.derivatives)
+
+    stem = os.path.splitext(os.path.basename(photo.image_file.name))[0]
+    derivatives = {}
+    try:
+        for width in WIDTHS:
+            if width >= image.width:
+                break
+            name = default_storage.save(
+                f"derivatives/{photo.pk}_{stem}_{width}.{EXTENSION}",
+                ContentFile(resize(image, width)),
+            )
+            derivatives[str(width)] = name
+    except OSError:
+        logger.exception("Could not write the derivatives of photo %s", photo_id)
+        delete_derivatives(derivatives)
+        # the earlier derivatives are gone too
+        Photo.objects.filter(pk=photo_id).update(derivatives={})
+        return False
+
+    if not Photo.objects.filter(pk=photo_id).update(derivatives=derivatives):
+        # the photo was deleted while its derivatives were being made
+        delete_derivatives(derivatives)
+    return True
+
+
+def delete_derivatives(derivatives):
+    """Delete the files of a Photo's derivatives dict from storage"""
+    for name in derivatives.values():
+        default_storage.delete(name)
+
+
+def run_in_worker(photo_id):
+    """Make the derivatives for one photo inside a worker thread"""
+    try:
+        make_derivatives(photo_id)
+    finally:
+        # worker threads get their own database connection; release it
+        connection.close()
+
+
+def schedule_derivatives(photo):
+    """Make the derivatives for photo once the current transaction commits"""
+    executor = get_executor()
+    if executor is None:
+        transaction.on_commit(lambda: make_derivatives(photo.pk))
+    else:
+        transaction.on_commit(lambda: executor.submit(run_in_worker, photo.pk))
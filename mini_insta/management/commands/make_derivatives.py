@@ -0,0 +1,35 @@
+# mini_insta/management/commands/make_derivatives.py
+# management command to generate resized copies of uploaded photos
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/22/2025
+
+from django.core.management.base import BaseCommand
+from mini_insta.images import make_derivatives
+from mini_insta.models import Photo
+
+
+class Command(BaseCommand):
+    help = "Generate resized copies of uploaded photos that do not have any yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="regenerate every uploaded photo"
+        )
+
+    def handle(self, *args, **options):
+        photos = Photo.objects.exclude(image_file="")
+        if not options["all"]:
+            photos = photos.filter(derivatives={})
+
+        count = 0
+        failed = []
+        for pk in photos.values_list("pk", flat=True):
+            if not make_derivatives(pk):
+                failed.append(pk)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Processed {count} photos"))
+        if failed:
+            self.stderr.write(
+                f"Could not process {len(failed)} photos: "
+                + ", ".join(str(pk) for pk in failed)
+            )
@@ -0,0 +1,19 @@
+# mini_insta/management/commands/rebuild_stats.py
+# management command to recompute the mini_insta counter tables
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/19/2025
+
+from django.core.management.base import BaseCommand
+from mini_insta.models import PostStats, ProfileStats, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the ProfileStats and PostStats counters from scratch."
+
+    def handle(self, *args, **options):
+        rebuild_stats()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. Rebuilt {ProfileStats.objects.count()} profile and "
+                f"{PostStats.objects.count()} post counters"
+            )
+        )
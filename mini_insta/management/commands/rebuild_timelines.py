@@ -0,0 +1,19 @@
+# mini_insta/management/commands/rebuild_timelines.py
+# management command to recompute the mini_insta feed timelines
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/20/2025
+
+from django.core.management.base import BaseCommand
+from mini_insta.models import TimelineEntry
+from mini_insta.timelines import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = "Recompute every fan-out-on-write feed timeline from scratch."
+
+    def handle(self, *args, **options):
+        rebuild_timelines()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. Rebuilt timelines with {TimelineEntry.objects.count()} entries"
+            )
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2025-12-19 15:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0011_alter_profile_join_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostStats",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="mini_insta.post",
+                    ),
+                ),
+                ("num_likes", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ProfileStats",
+            fields=[
+                (
+                    "profile",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="mini_insta.profile",
+                    ),
+                ),
+                ("num_posts", models.IntegerField(default=0)),
+                ("num_followers", models.IntegerField(default=0)),
+                ("num_following", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2025-12-20 13:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0012_profilestats_poststats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimelineEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="follow",
+            index=models.Index(
+                fields=["profile", "follower_profile"], name="follow_profile_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["profile", "-timestamp"], name="post_profile_time_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="mini_insta.post"
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="profile",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeline",
+                to="mini_insta.profile",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["profile", "-timestamp"], name="timeline_profile_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2025-12-21 11:20
+
+from django.db import migrations
+
+# one FTS5 index for posts and profiles; the rowid is 2 * post id for a
+# post and 2 * profile id + 1 for a profile, so triggers can find rows by rowid
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE mini_insta_search USING fts5(body, tokenize='unicode61')",
+    """CREATE TRIGGER mini_insta_search_post_insert AFTER INSERT ON mini_insta_post
+    BEGIN
+        INSERT INTO mini_insta_search(rowid, body) VALUES (new.id * 2, new.caption);
+    END""",
+    """CREATE TRIGGER mini_insta_search_post_update AFTER UPDATE OF caption ON mini_insta_post
+    BEGIN
+        DELETE FROM mini_insta_search WHERE rowid = old.id * 2;
+        INSERT INTO mini_insta_search(rowid, body) VALUES (new.id * 2, new.caption);
+    END""",
+    """CREATE TRIGGER mini_insta_search_post_delete AFTER DELETE ON mini_insta_post
+    BEGIN
+        DELETE FROM mini_insta_search WHERE rowid = old.id * 2;
+    END""",
+    """CREATE TRIGGER mini_insta_search_profile_insert AFTER INSERT ON mini_insta_profile
+    BEGIN
+        INSERT INTO mini_insta_search(rowid, body) VALUES (
+            new.id * 2 + 1, new.username || ' ' || new.display_name || ' ' || new.bio_text
+        );
+    END""",
+    """CREATE TRIGGER mini_insta_search_profile_update
+    AFTER UPDATE OF username, display_name, bio_text ON mini_insta_profile
+    BEGIN
+        DELETE FROM mini_insta_search WHERE rowid = old.id * 2 + 1;
+        INSERT INTO mini_insta_search(rowid, body) VALUES (
+            new.id * 2 + 1, new.username || ' ' || new.display_name || ' ' || new.bio_text
+        );
+    END""",
+    """CREATE TRIGGER mini_insta_search_profile_delete AFTER DELETE ON mini_insta_profile
+    BEGIN
+        DELETE FROM mini_insta_search WHERE rowid = old.id * 2 + 1;
+    END""",
+    """INSERT INTO mini_insta_search(rowid, body)
+    SELECT id * 2, caption FROM mini_insta_post""",
+    """INSERT INTO mini_insta_search(rowid, body)
+    SELECT id * 2 + 1, username || ' ' || display_name || ' ' || bio_text
+    FROM mini_insta_profile""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS mini_insta_search_post_insert",
+    "DROP TRIGGER IF EXISTS mini_insta_search_post_update",
+    "DROP TRIGGER IF EXISTS mini_insta_search_post_delete",
+    "DROP TRIGGER IF EXISTS mini_insta_search_profile_insert",
+    "DROP TRIGGER IF EXISTS mini_insta_search_profile_update",
+    "DROP TRIGGER IF EXISTS mini_insta_search_profile_delete",
+    "DROP TABLE IF EXISTS mini_insta_search",
+]
+
+
+def run(statements):
+    """Return a migration function running statements on SQLite only"""
+
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for sql in statements:
+                schema_editor.execute(sql)
+
+    return forwards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0013_timelineentry"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2025-12-22 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mini_insta", "0014_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photo",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -2,11 +2,63 @@
 # model for the mini-insta application
 # Author: Yihang Duanmu (harrydm@bu.edu), 10/24/2025
 
-from django.db import models
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.contrib.auth.models import User  # for authentication
 
 
+def counters_enabled():
+    """Return True if the ProfileStats/PostStats counter tables are maintained"""
+    return getattr(settings, "MINI_INSTA_COUNTERS", False)
+
+
+def timelines_enabled():
+    """Return True if feeds are read from the fan-out-on-write TimelineEntry table"""
+    return getattr(settings, "MINI_INSTA_TIMELINES", False)
+
+
+def count_subquery(model, field):
+    """Return a subquery counting the rows of model whose field is the outer pk"""
+    rows = (
+        model.objects.filter(**{field: models.OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+    return Coalesce(models.Subquery(rows), 0)
+
+
+def profile_counts():
+    """Return the subqueries counting the posts, followers and following of a profile"""
+    return {
+        "num_posts": count_subquery(Post, "profile"),
+        "num_followers": count_subquery(Follow, "profile"),
+        "num_following": count_subquery(Follow, "follower_profile"),
+    }
+
+
+class ProfileQuerySet(models.QuerySet):
+    """QuerySet of profiles with helpers for annotating counts"""
+
+    def with_stats(self):
+        """
+        Return these profiles annotated with num_posts, num_followers and
+        num_following, computed in the same query without loading any rows.
+        With MINI_INSTA_COUNTERS on, the ProfileStats counters are read instead.
+        """
+        counts = profile_counts()
+        if counters_enabled():
+            counts = {
+                name: Coalesce(f"stats__{name}", count)
+                for name, count in counts.items()
+            }
+        return self.annotate(**counts)
+
+
 # Create your models here.
 class Profile(models.Model):
     """Encapsulate the data of the profile of an individual user"""
@@ -19,6 +71,8 @@ class Profile(models.Model):
     join_date = models.DateField(blank=False, auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    objects = ProfileQuerySet.as_manager()
+
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"{self.display_name}"
@@ -26,15 +80,17 @@ class Profile(models.Model):
     def get_all_posts(self):
         """Return a QuerySet of comments about this profile"""
 
-        # use the object manager to retrieve posts
-        posts = Post.objects.filter(profile=self)
+        # use the object manager to retrieve posts with their photos
+        posts = Post.objects.filter(profile=self).prefetch_related("photo_set")
         return posts
 
     def get_num_posts(self):
         """Return the number of posts for a profile"""
 
-        posts = Post.objects.filter(profile=self)
-        return len(posts)
+        # use the count annotated by with_stats() if there is one
+        if hasattr(self, "num_posts"):
+            return self.num_posts
+        return Post.objects.filter(profile=self).count()
 
     def get_followers(self):
         """Return a QuerySet of followers of this profile"""
@@ -46,8 +102,10 @@ class Profile(models.Model):
     def get_num_followers(self):
         """Return the number of followers for a profile"""
 
-        followers = Follow.objects.filter(profile=self)
-        return len(followers)
+        # use the count annotated by with_stats() if there is one
+        if hasattr(self, "num_followers"):
+            return self.num_followers
+        return Follow.objects.filter(profile=self).count()
 
     def get_following(self):
         """Return a QuerySet of followers of this profile"""
@@ -59,12 +117,21 @@ class Profile(models.Model):
     def get_num_following(self):
         """Return the number of followers for a profile"""
 
-        following = Follow.objects.filter(follower_profile=self)
-        return len(following)
+        # use the count annotated by with_stats() if there is one
+        if hasattr(self, "num_following"):
+            return self.num_following
+        return Follow.objects.filter(follower_profile=self).count()
 
     def get_post_feed(self):
         """Return a QuerySet of posts from this profile's following"""
 
+        # read the materialized timeline if it is maintained
+        if timelines_enabled():
+            from .timelines import timeline_post_ids
+
+            ids = timeline_post_ids(self)
+            return Post.objects.filter(pk__in=ids).order_by("-timestamp")
+
         # use the object manager to retrieve following
         following = Follow.objects.filter(follower_profile=self).values_list(
             "profile", flat=True
@@ -82,6 +149,37 @@ class Profile(models.Model):
         return reverse("show_profile", kwargs={"pk": pk})
 
 
+class PostQuerySet(models.QuerySet):
+    """QuerySet of posts with helpers for loading related data up front"""
+
+    def with_feed_data(self):
+        """
+        Return these posts with everything a feed renders already loaded:
+        the author profile, the photos, the comments with their authors,
+        the number of likes and the username of the first liker.
+        """
+        first_like = Like.objects.filter(post=models.OuterRef("pk")).order_by("pk")
+        num_likes = count_subquery(Like, "post")
+        if counters_enabled():
+            num_likes = Coalesce("stats__num_likes", num_likes)
+        return (
+            self.select_related("profile")
+            .prefetch_related(
+                models.Prefetch("photo_set", queryset=Photo.objects.order_by("pk")),
+                models.Prefetch(
+                    "comment_set",
+                    queryset=Comment.objects.select_related("profile").order_by("pk"),
+                ),
+            )
+            .annotate(
+                num_likes=num_likes,
+                first_liker_username=models.Subquery(
+                    first_like.values("profile__username")[:1]
+                ),
+            )
+        )
+
+
 class Post(models.Model):
     """Encapsulate the data of a post by an individual user"""
 
@@ -90,6 +188,16 @@ class Post(models.Model):
     timestamp = models.DateTimeField(auto_now=True)
     caption = models.TextField(blank=False)
 
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # a profile's recent posts, for pulling posts into feeds
+            models.Index(
+                fields=["profile", "-timestamp"], name="post_profile_time_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"Post by {self.profile.display_name} on {self.timestamp}"
@@ -104,15 +212,15 @@ class Post(models.Model):
     def get_all_photos(self):
         """Return a QuerySet of photos about this post"""
 
-        # use the object manager to retrieve photos
-        photos = Photo.objects.filter(post=self)
+        # use the related manager so prefetched photos are reused
+        photos = self.photo_set.all()
         return photos
 
     def get_all_comments(self):
         """Return a QuerySet of comments about this post"""
 
-        # use the object manager to retrieve comments
-        comments = Comment.objects.filter(post=self)
+        # use the related manager so prefetched comments are reused
+        comments = self.comment_set.all()
         return comments
 
     def get_likes(self):
@@ -125,8 +233,21 @@ class Post(models.Model):
     def get_num_likes(self):
         """Return the number of likes for a post"""
 
-        likes = Like.objects.filter(post=self)
-        return len(likes)
+        # use the count annotated by with_feed_data() if there is one
+        if hasattr(self, "num_likes"):
+            return self.num_likes
+        if counters_enabled() and hasattr(self, "stats"):
+            return self.stats.num_likes
+        return Like.objects.filter(post=self).count()
+
+    def get_first_liker(self):
+        """Return the username of the first profile to like this post"""
+
+        # use the username annotated by with_feed_data() if there is one
+        if hasattr(self, "first_liker_username"):
+            return self.first_liker_username
+        like = self.get_likes().select_related("profile").first()
+        return like.profile.username if like else None
 
 
 class Photo(models.Model):
@@ -137,17 +258,35 @@ class Photo(models.Model):
     image_url = models.URLField(blank=True)
     image_file = models.ImageField(blank=True)
     timestamp = models.DateTimeField(auto_now=True)
+    # width (as a string) -> storage path of a resized copy, see images.py
+    derivatives = models.JSONField(default=dict, blank=True)
 
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"Image for comment by {self.post.profile.display_name} on {self.post.timestamp}"
 
-    def get_image_url(self):
+    def get_image_url(self, width=None):
+        """
+        Return the URL of this photo's image. Given a width, return the
+        smallest derivative at least that wide, if one has been generated.
+        """
         if self.image_file:
+            if width is not None:
+                for size in sorted(self.derivatives, key=int):
+                    if int(size) >= width:
+                        return default_storage.url(self.derivatives[size])
             return self.image_file.url
         else:
             return self.image_url
 
+    def get_thumbnail_url(self):
+        """Return the URL of a small copy of the image for profile grids"""
+        return self.get_image_url(320)
+
+    def get_feed_image_url(self):
+        """Return the URL of a medium copy of the image for feeds"""
+        return self.get_image_url(640)
+
 
 class Follow(models.Model):
     """Encapsulate the data of a profile associated to another profile"""
@@ -161,6 +300,13 @@ class Follow(models.Model):
     )
     timestamp = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["profile", "follower_profile"], name="follow_profile_idx"
+            ),
+        ]
+
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return (
@@ -193,3 +339,90 @@ class Like(models.Model):
     def __str__(self) -> str:
         """return a string representation of this model instance"""
         return f"Like by {self.profile.display_name} on {self.post.profile.display_name}'s post"
+
+
+class ProfileStats(models.Model):
+    """
+    Denormalized counters for a Profile, kept current by the signal
+    handlers in signals.py when MINI_INSTA_COUNTERS is on
+    """
+
+    profile = models.OneToOneField(
+        Profile, primary_key=True, related_name="stats", on_delete=models.CASCADE
+    )
+    num_posts = models.IntegerField(default=0)
+    num_followers = models.IntegerField(default=0)
+    num_following = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        """return a string representation of this model instance"""
+        return f"Stats for {self.profile.display_name}"
+
+
+class PostStats(models.Model):
+    """
+    Denormalized counters for a Post, kept current by the signal
+    handlers in signals.py when MINI_INSTA_COUNTERS is on
+    """
+
+    post = models.OneToOneField(
+        Post, primary_key=True, related_name="stats", on_delete=models.CASCADE
+    )
+    num_likes = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        """return a string representation of this model instance"""
+        return f"Stats for {self.post}"
+
+
+class TimelineEntry(models.Model):
+    """
+    One post pushed into the feed of one follower, written by the
+    fan-out-on-write signal handlers when MINI_INSTA_TIMELINES is on
+    """
+
+    profile = models.ForeignKey(
+        Profile, related_name="timeline", on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["profile", "-timestamp"], name="timeline_profile_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """return a string representation of this model instance"""
+        return f"{self.post} in the feed of {self.profile.display_name}"
+
+
+def rebuild_stats():
+    """Recompute every ProfileStats and PostStats row from the source tables"""
+
+    profiles = Profile.objects.annotate(**profile_counts()).values_list(
+        "pk", "num_posts", "num_followers", "num_following"
+    )
+    posts = Post.objects.annotate(num_likes=count_subquery(Like, "post")).values_list(
+        "pk", "num_likes"
+    )
+
+    with transaction.atomic():
+        ProfileStats.objects.all().delete()
+        ProfileStats.objects.bulk_create(
+            [
+                ProfileStats(
+                    profile_id=pk,
+                    num_posts=num_posts,
+                    num_followers=num_followers,
+                    num_following=num_following,
+                )
+                for pk, num_posts, num_followers, num_following in profiles
+            ],
+            batch_size=1000,
+        )
+        PostStats.objects.all().delete()
+        PostStats.objects.bulk_create(
+            [PostStats(post_id=pk, num_likes=num_likes) for pk, num_likes in posts],
+            batch_size=1000,
+        )
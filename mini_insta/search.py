@@ -0,0 +1,95 @@
+# mini_insta/search.py
+# full-text search over posts and profiles for the mini_insta application
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/21/2025
+
+import re
+from django.db import connection
+from .models import *
+
+# set up by migration 0014_search_index
+SEARCH_TABLE = "mini_insta_search"
+
+
+def fts_available():
+    """Return True if the database has the FTS5 search index"""
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    """
+    Turn a user's search text into an FTS5 MATCH expression in which every
+    word must appear, as a whole word or as a prefix.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# the rowid of a hit modulo 2 tells which kind of row it indexes
+POSTS = 0
+PROFILES = 1
+
+
+class SearchHits:
+    """
+    The rowids of one kind of row (POSTS or PROFILES) matching a query in
+    the search index, best match first. Behaves enough like a sequence to
+    be given to a Paginator, so only the requested page is read from the
+    index.
+    """
+
+    def __init__(self, query, kind, counts=None):
+        self.match = match_expression(query)
+        self.kind = kind
+        # shared with the hits of the other kind, see search_hits()
+        self.counts = {} if counts is None else counts
+
+    def count(self):
+        """Return the number of matching rows of this kind"""
+        if not self.counts:
+            self.counts.update({POSTS: 0, PROFILES: 0})
+            if self.match:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT rowid %% 2, COUNT(*) FROM {SEARCH_TABLE} "
+                        f"WHERE {SEARCH_TABLE} MATCH %s GROUP BY 1",
+                        [self.match],
+                    )
+                    self.counts.update(cursor.fetchall())
+        return self.counts[self.kind]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("SearchHits only supports slicing")
+        if not self.match:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                "AND rowid %% 2 = %s ORDER BY rank LIMIT %s OFFSET %s",
+                [self.match, self.kind, index.stop - start, start],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def search_hits(query):
+    """Return the (profile, post) SearchHits of query, counted in one query"""
+    counts = {}
+    return SearchHits(query, PROFILES, counts), SearchHits(query, POSTS, counts)
+
+
+def load_profiles(rowids):
+    """Return the profiles for a page of profile rowids, in rank order"""
+    profile_ids = [rowid // 2 for rowid in rowids]
+    profiles = Profile.objects.in_bulk(profile_ids)
+    return [profiles[pk] for pk in profile_ids if pk in profiles]
+
+
+def load_posts(rowids):
+    """Return the posts for a page of post rowids, in rank order"""
+    post_ids = [rowid // 2 for rowid in rowids]
+    posts = Post.objects.with_feed_data().in_bulk(post_ids)
+    return [posts[pk] for pk in post_ids if pk in posts]
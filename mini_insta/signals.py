@@ -0,0 +1,95 @@
+# mini_insta/signals.py
+# signal handlers keeping the mini_insta counter and timeline tables current
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/19/2025
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import *
+from . import timelines
+from .images import delete_derivatives
+
+
+def bump(model, key, values, created):
+    """
+    Add values (a dict of counter name to delta) to the counter row for key.
+    A missing row is only created, with fresh counts, after an insert; on
+    delete the owner may itself be going away in the same cascade.
+    """
+    updated = model.objects.filter(pk=key).update(
+        **{name: F(name) + delta for name, delta in values.items()}
+    )
+    if not updated and created:
+        rebuild_row(model, key)
+
+
+def rebuild_row(model, key):
+    """Create the counter row for key from the source tables"""
+    if model is ProfileStats:
+        counts = Profile.objects.filter(pk=key).annotate(**profile_counts())
+        for profile in counts:
+            ProfileStats.objects.get_or_create(
+                profile=profile,
+                defaults={
+                    "num_posts": profile.num_posts,
+                    "num_followers": profile.num_followers,
+                    "num_following": profile.num_following,
+                },
+            )
+    else:
+        PostStats.objects.get_or_create(
+            post_id=key, defaults={"num_likes": Like.objects.filter(post=key).count()}
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created and counters_enabled():
+        bump(ProfileStats, instance.profile_id, {"num_posts": 1}, True)
+    if created and timelines_enabled():
+        timelines.fan_out(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if counters_enabled():
+        bump(ProfileStats, instance.profile_id, {"num_posts": -1}, False)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created and counters_enabled():
+        bump(ProfileStats, instance.profile_id, {"num_followers": 1}, True)
+        bump(ProfileStats, instance.follower_profile_id, {"num_following": 1}, True)
+    if created and timelines_enabled():
+        timelines.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if counters_enabled():
+        bump(ProfileStats, instance.profile_id, {"num_followers": -1}, False)
+        bump(ProfileStats, instance.follower_profile_id, {"num_following": -1}, False)
+    if timelines_enabled():
+        timelines.remove(instance)
+
+
+@receiver(post_save, sender=Like)
+def like_saved(sender, instance, created, **kwargs):
+    if created and counters_enabled():
+        bump(PostStats, instance.post_id, {"num_likes": 1}, True)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, **kwargs):
+    if counters_enabled():
+        bump(PostStats, instance.post_id, {"num_likes": -1}, False)
+
+
+@receiver(post_delete, sender=Photo)
+def photo_deleted(sender, instance, **kwargs):
+    """Delete the photo's resized copies once the delete commits"""
+    if instance.derivatives:
+        derivatives = instance.derivatives
+        transaction.on_commit(lambda: delete_derivatives(derivatives))
@@ -1,3 +1,292 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from .models import *
+from . import timelines
 
-# Create your tests here.
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class FeedQueryBudgetTests(TestCase):
+    """Check that the feed stays within its query budget as it grows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create(username=f"user{i}") for i in range(4)]
+        cls.profiles = [
+            Profile.objects.create(
+                username=f"user{i}",
+                display_name=f"User {i}",
+                profile_image_url="https://example.com/user.png",
+                user=user,
+            )
+            for i, user in enumerate(users)
+        ]
+        reader = cls.profiles[0]
+        for author in cls.profiles[1:]:
+            Follow.objects.create(profile=author, follower_profile=reader)
+            for n in range(10):
+                post = Post.objects.create(profile=author, caption=f"post {n}")
+                Photo.objects.create(post=post, image_url="https://example.com/p.png")
+                for profile in cls.profiles:
+                    Like.objects.create(post=post, profile=profile)
+                    Comment.objects.create(post=post, profile=profile, text="nice")
+
+    def test_feed_within_query_budget(self):
+        self.client.force_login(self.profiles[0].user)
+        response = self.client.get(reverse("show_feed"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["posts"]), 30)
+
+
+@override_settings(MINI_INSTA_IMAGE_WORKERS=0)
+class PhotoDerivativeTests(TestCase):
+    """Check how the resized copies of uploaded photos are made and removed"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        user = User.objects.create(username="user")
+        Profile.objects.create(
+            username="user",
+            display_name="User",
+            profile_image_url="https://example.com/user.png",
+            user=user,
+        )
+        self.client.force_login(user)
+
+    def upload(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("create_post"),
+                {
+                    "caption": "upload",
+                    "image_files": SimpleUploadedFile("photo.jpg", content),
+                },
+            )
+        self.assertEqual(response.status_code, 302)
+        return Photo.objects.get()
+
+    def test_corrupt_upload_keeps_post(self):
+        with self.assertLogs("mini_insta.images", "ERROR"):
+            photo = self.upload(b"not an image")
+        self.assertEqual(photo.derivatives, {})
+
+    def test_deleting_photo_deletes_derivatives(self):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600)).save(buffer, "JPEG")
+        photo = self.upload(buffer.getvalue())
+        self.assertEqual(set(photo.derivatives), {"320", "640"})
+        for name in photo.derivatives.values():
+            self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        for name in photo.derivatives.values():
+            self.assertFalse(default_storage.exists(name))
+
+
+def create_profiles(count, prefix="user"):
+    """Create count Profiles, each with its own User."""
+    return [
+        Profile.objects.create(
+            username=f"{prefix}{i}",
+            display_name=f"User {i}",
+            profile_image_url="https://example.com/user.png",
+            user=User.objects.create(username=f"{prefix}{i}"),
+        )
+        for i in range(count)
+    ]
+
+
+@override_settings(MINI_INSTA_COUNTERS=True)
+class CounterTests(TestCase):
+    """Check that the counter tables follow the writes they count"""
+
+    def counters(self):
+        """Return the non-zero counter rows; a missing row counts as zero."""
+        profiles = ProfileStats.objects.values_list(
+            "profile", "num_posts", "num_followers", "num_following"
+        )
+        posts = PostStats.objects.values_list("post", "num_likes")
+        return (
+            sorted(row for row in profiles if any(row[1:])),
+            sorted(row for row in posts if row[1]),
+        )
+
+    def test_counters_follow_writes(self):
+        profiles = create_profiles(4)
+        posts = [
+            Post.objects.create(profile=profile, caption="hello")
+            for profile in profiles
+            for _ in range(2)
+        ]
+        follows = [
+            Follow.objects.create(profile=a, follower_profile=b)
+            for a in profiles
+            for b in profiles
+            if a != b
+        ]
+        likes = [
+            Like.objects.create(post=post, profile=profile)
+            for post in posts[::2]
+            for profile in profiles
+        ]
+        follows[0].delete()
+        likes[0].delete()
+        posts[3].delete()
+
+        maintained = self.counters()
+        rebuild_stats()
+        self.assertEqual(maintained, self.counters())
+
+        profile = Profile.objects.with_stats().get(pk=profiles[0].pk)
+        self.assertEqual(
+            (profile.num_posts, profile.num_followers, profile.num_following),
+            (2, 2, 3),
+        )
+        self.assertEqual(Post.objects.get(pk=posts[0].pk).get_num_likes(), 3)
+
+    def test_profile_page_reads_setting_per_request(self):
+        profile = create_profiles(1)[0]
+        rebuild_stats()
+        ProfileStats.objects.update(num_followers=42)
+        url = reverse("show_profile", args=[profile.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.context["profile"].num_followers, 42)
+        with self.settings(MINI_INSTA_COUNTERS=False):
+            response = self.client.get(url)
+        self.assertEqual(response.context["profile"].num_followers, 0)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class SearchTests(TestCase):
+    """Check the full-text search over profiles and posts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = create_profiles(3)
+        cls.profiles[0].bio_text = "marathon runner"
+        cls.profiles[0].save()
+        cls.post = Post.objects.create(
+            profile=cls.profiles[1], caption="training for the marathon"
+        )
+
+    def search(self, query, **params):
+        """Return the context of the search results page for query"""
+        self.client.force_login(self.profiles[2].user)
+        response = self.client.get(reverse("search"), {"query": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_prefix_matches_whole_words(self):
+        context = self.search("mara")
+        self.assertEqual(context["profiles"], [self.profiles[0]])
+        self.assertEqual(context["posts"], [self.post])
+        self.assertEqual(self.search("arathon")["numPosts"], 0)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.post.caption = "rest day"
+        self.post.save()
+        self.assertEqual(self.search("marathon")["posts"], [])
+        self.assertEqual(self.search("rest")["posts"], [self.post])
+
+        self.profiles[0].bio_text = "swimmer"
+        self.profiles[0].save()
+        self.assertEqual(self.search("marathon")["numProfiles"], 0)
+
+        self.post.delete()
+        context = self.search("rest")
+        self.assertEqual(context["posts"], [])
+        self.assertEqual(context["numPosts"], 0)
+
+    def test_profiles_and_posts_are_paged_separately(self):
+        posts = [
+            Post.objects.create(profile=self.profiles[1], caption=f"marathon {n}")
+            for n in range(25)
+        ]
+        context = self.search("marathon")
+        self.assertEqual(context["numProfiles"], 1)
+        self.assertEqual(context["numPosts"], 26)
+        self.assertEqual(context["profiles"], [self.profiles[0]])
+        self.assertEqual(len(context["posts"]), 20)
+
+        # the profile is not repeated or lost on the second page of posts
+        context = self.search("marathon", page=2)
+        self.assertEqual(context["profiles"], [self.profiles[0]])
+        self.assertEqual(len(context["posts"]), 6)
+
+        found = self.search("marathon")["posts"] + context["posts"]
+        self.assertCountEqual(found, posts + [self.post])
+
+
+@override_settings(MINI_INSTA_TIMELINES=True)
+class TimelineTests(TestCase):
+    """Check that the fan-out timelines give the same feeds as the follow query"""
+
+    def setUp(self):
+        cache.delete(timelines.POPULAR_KEY)
+        self.addCleanup(cache.delete, timelines.POPULAR_KEY)
+        self.reader, self.author, self.other = create_profiles(3)
+
+    def timeline(self, profile):
+        """Return the post ids in the timeline table of profile"""
+        return set(
+            TimelineEntry.objects.filter(profile=profile).values_list("post", flat=True)
+        )
+
+    def test_new_post_fans_out_to_followers(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        post = Post.objects.create(profile=self.author, caption="hello")
+        self.assertEqual(self.timeline(self.reader), {post.pk})
+        self.assertEqual(self.timeline(self.other), set())
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        posts = [Post.objects.create(profile=self.author, caption=n) for n in "abc"]
+        mine = Post.objects.create(profile=self.other, caption="mine")
+        Follow.objects.create(profile=self.other, follower_profile=self.reader)
+        follow = Follow.objects.create(
+            profile=self.author, follower_profile=self.reader
+        )
+        self.assertEqual(self.timeline(self.reader), {p.pk for p in posts} | {mine.pk})
+
+        follow.delete()
+        self.assertEqual(self.timeline(self.reader), {mine.pk})
+
+    def test_popular_profiles_are_pulled_when_read(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        with mock.patch.object(timelines, "FANOUT_LIMIT", 0):
+            # the popular set is cached for a while; find it again now
+            cache.delete(timelines.POPULAR_KEY)
+            post = Post.objects.create(profile=self.author, caption="news")
+            self.assertEqual(self.timeline(self.reader), set())
+            self.assertEqual(timelines.timeline_post_ids(self.reader), [post.pk])
+
+    def test_timeline_is_trimmed_when_read(self):
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        posts = [Post.objects.create(profile=self.author, caption=n) for n in "abcde"]
+        with mock.patch.object(timelines, "TIMELINE_LENGTH", 3):
+            newest = [p.pk for p in reversed(posts[2:])]
+            self.assertEqual(timelines.timeline_post_ids(self.reader), newest)
+        self.assertEqual(self.timeline(self.reader), set(newest))
+
+    def test_feed_order_matches_follow_query(self):
+        for author in [self.author, self.other]:
+            Follow.objects.create(profile=author, follower_profile=self.reader)
+        for n in range(6):
+            Post.objects.create(profile=[self.author, self.other][n % 2], caption=n)
+        Post.objects.create(profile=self.reader, caption="not in my feed")
+
+        feed = list(self.reader.get_post_feed())
+        with override_settings(MINI_INSTA_TIMELINES=False):
+            self.assertEqual(feed, list(self.reader.get_post_feed()))
+        self.assertEqual(len(feed), 6)
@@ -0,0 +1,121 @@
+# mini_insta/timelines.py
+# fan-out-on-write feed timelines for the mini_insta application
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/20/2025
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from .models import *
+
+# most recent posts kept in each follower's timeline
+TIMELINE_LENGTH = 500
+
+# profiles with more followers than this are not fanned out; their posts
+# are pulled into feeds when they are read
+FANOUT_LIMIT = 1000
+
+POPULAR_KEY = "mini_insta:popular_profiles"
+POPULAR_TIMEOUT = 5 * 60
+
+
+def popular_profile_ids():
+    """Return the set of profile ids with more than FANOUT_LIMIT followers"""
+
+    def find_popular():
+        return set(
+            Follow.objects.order_by()
+            .values("profile")
+            .annotate(count=Count("pk"))
+            .filter(count__gt=FANOUT_LIMIT)
+            .values_list("profile", flat=True)
+        )
+
+    return cache.get_or_set(POPULAR_KEY, find_popular, POPULAR_TIMEOUT)
+
+
+def fan_out(post):
+    """Push a new post into the timeline of every follower of its author"""
+
+    if post.profile_id in popular_profile_ids():
+        return
+
+    followers = Follow.objects.filter(profile=post.profile_id).values_list(
+        "follower_profile", flat=True
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(profile_id=follower, post=post, timestamp=post.timestamp)
+            for follower in followers.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+def backfill(follow):
+    """Copy the recent posts of a newly followed profile into the follower's timeline"""
+
+    if follow.profile_id in popular_profile_ids():
+        return
+
+    posts = Post.objects.filter(profile=follow.profile_id).order_by("-timestamp")
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                profile_id=follow.follower_profile_id, post_id=pk, timestamp=timestamp
+            )
+            for pk, timestamp in posts.values_list("pk", "timestamp")[:TIMELINE_LENGTH]
+        ]
+    )
+
+
+def remove(follow):
+    """Drop the posts of an unfollowed profile from the follower's timeline"""
+
+    TimelineEntry.objects.filter(
+        profile=follow.follower_profile_id, post__profile=follow.profile_id
+    ).delete()
+
+
+def timeline_post_ids(profile):
+    """
+    Return the ids of the most recent posts in the feed of profile: its
+    timeline entries, merged with the latest posts of the popular profiles
+    it follows. Entries past TIMELINE_LENGTH are trimmed on the way.
+    """
+
+    entries = list(
+        TimelineEntry.objects.filter(profile=profile)
+        .order_by("-timestamp", "-pk")
+        .values_list("pk", "post", "timestamp")[: TIMELINE_LENGTH + 1]
+    )
+    if len(entries) > TIMELINE_LENGTH:
+        _, _, oldest = entries.pop()
+        TimelineEntry.objects.filter(profile=profile, timestamp__lte=oldest).exclude(
+            pk__in=[pk for pk, _, _ in entries]
+        ).delete()
+
+    feed = {post: timestamp for _, post, timestamp in entries}
+
+    popular = popular_profile_ids()
+    if popular:
+        pulled = Follow.objects.filter(
+            profile__in=popular, follower_profile=profile
+        ).values_list("profile", flat=True)
+        posts = (
+            Post.objects.filter(profile__in=list(pulled))
+            .order_by("-timestamp")
+            .values_list("pk", "timestamp")[:TIMELINE_LENGTH]
+        )
+        feed.update(posts)
+
+    newest = sorted(feed, key=feed.get, reverse=True)
+    return newest[:TIMELINE_LENGTH]
+
+
+def rebuild_timelines():
+    """Recompute every timeline from the Follow and Post tables"""
+
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        for follow in Follow.objects.iterator():
+            backfill(follow)
@@ -8,6 +8,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
+from django.core.paginator import Paginator
 from django.views.generic import (
     View,
     ListView,
@@ -18,6 +19,8 @@ from django.views.generic import (
 )
 from .forms import *
 from .models import *
+from .images import schedule_derivatives
+from .search import fts_available, load_posts, load_profiles, search_hits
 
 
 class ProfileRequiredMixin(LoginRequiredMixin):
@@ -42,14 +45,19 @@ class ProfileDetailView(DetailView):
     """Define a view class to show one profile"""
 
     model = Profile
+    query_budget = 10
     template_name = "mini_insta/show_profile.html"
     context_object_name = "profile"
 
+    def get_queryset(self):
+        """Annotate the counts, reading MINI_INSTA_COUNTERS on every request"""
+        return Profile.objects.with_stats()
+
     def get_context_data(self, **kwargs):
         # see if the person is being followed by this logged in user
         if self.request.user.is_authenticated:
             context = super().get_context_data(**kwargs)
-            profile = self.get_object()
+            profile = self.object
             user_profile = Profile.objects.get(user=self.request.user)
             is_following = (
                 profile.get_followers().filter(follower_profile=user_profile).exists()
@@ -69,7 +77,7 @@ class LoggedInProfileDetailView(DetailView):
     context_object_name = "profile"
 
     def get_object(self):
-        return Profile.objects.get(user=self.request.user)
+        return Profile.objects.with_stats().get(user=self.request.user)
 
 
 class PostDetailView(DetailView):
@@ -144,7 +152,8 @@ class CreatePostView(ProfileRequiredMixin, CreateView):
             files = self.request.FILES.getlist("image_files")
             if len(files) != 0:
                 for file in files:
-                    Photo.objects.create(post=self.object, image_file=file)
+                    photo = Photo.objects.create(post=self.object, image_file=file)
+                    schedule_derivatives(photo)
 
         return response
 
@@ -234,27 +243,25 @@ class PostFeedListView(ProfileRequiredMixin, ListView):
     model = Post
     template_name = "mini_insta/show_feed.html"
     context_object_name = "posts"
+    query_budget = 10
 
     def get_queryset(self):
         """Return the set of posts for post feed"""
 
-        queryset = super().get_queryset()
-
-        profile = Profile.objects.get(user=self.request.user)
-        queryset = profile.get_post_feed()
+        self.profile = Profile.objects.get(user=self.request.user)
+        queryset = self.profile.get_post_feed().with_feed_data()
         return queryset
 
     def get_context_data(self, **kwargs):
         """Return the dictionary of context vatiable for use in the template"""
 
         context = super().get_context_data(**kwargs)
-        profile = Profile.objects.get(user=self.request.user)
 
         # provide profile as context
-        context["profile"] = profile
+        context["profile"] = self.profile
 
-        # provide number of feed posts as context
-        context["numPosts"] = self.get_queryset().count()
+        # provide number of feed posts as context (evaluates the feed once)
+        context["numPosts"] = len(self.object_list)
 
         return context
 
@@ -265,6 +272,8 @@ class SearchView(ProfileRequiredMixin, ListView):
     model = Post
     template_name = "mini_insta/search_results.html"
     context_object_name = "posts"
+    paginate_by = 20
+    query_budget = 10
 
     def dispatch(self, request, *args, **kwargs):
         """called first to dispatch (handle) any request"""
@@ -283,26 +292,34 @@ class SearchView(ProfileRequiredMixin, ListView):
         else:
             return response
 
-    def get_queryset(self):
-        """Return the set of posts for post feed"""
-
-        queryset = super().get_queryset()
-
-        if self.request.GET:
-            query = self.request.GET["query"]
-            print(query)
-            if query == "":
-                queryset = Post.objects.none()
+    def get_hits(self):
+        """Return the (profiles, posts) matching the query, looked up once"""
+        if not hasattr(self, "hits"):
+            query = self.request.GET.get("query", "")
+            if fts_available():
+                self.hits = search_hits(query)
+            elif query == "":
+                self.hits = Profile.objects.none(), Post.objects.none()
             else:
-                queryset = Post.objects.filter(caption__contains=query)
+                # fall back to unindexed substring matching without the FTS5 index
+                profiles = (
+                    Profile.objects.filter(username__contains=query)
+                    | Profile.objects.filter(display_name__contains=query)
+                    | Profile.objects.filter(bio_text__contains=query)
+                )
+                posts = Post.objects.filter(caption__contains=query)
+                self.hits = profiles.order_by("pk"), posts.with_feed_data()
+        return self.hits
 
-        return queryset
+    def get_queryset(self):
+        """Return the posts matching the query, paginated by the ListView"""
+        return self.get_hits()[1]
 
     def get_context_data(self, **kwargs):
         """Return the dictionary of context vatiable for use in the template"""
 
         context = super().get_context_data(**kwargs)
-        profile = Profile.objects.get(user=self.request.user)
+        profile = Profile.objects.select_related("user").get(user=self.request.user)
 
         # provide profile as context
         context["profile"] = profile
@@ -312,25 +329,28 @@ class SearchView(ProfileRequiredMixin, ListView):
         if query:
             context["query"] = query
 
-        # provide posts that match the query as context
-        posts = self.get_queryset()
-        context["posts"] = posts
+        # profiles are paged on their own, so a low-ranked profile is not
+        # pushed behind pages of posts
+        profile_page = Paginator(self.get_hits()[0], self.paginate_by).get_page(
+            self.request.GET.get("profile_page")
+        )
+        context["profile_page_obj"] = profile_page
 
-        if query == "":
-            profiles = Profile.objects.none()
+        # load the profiles and posts on these pages of hits
+        if fts_available():
+            profiles = load_profiles(profile_page.object_list)
+            posts = load_posts(context["object_list"])
         else:
-            profiles = (
-                Profile.objects.filter(username__contains=query)
-                | Profile.objects.filter(display_name__contains=query)
-                | Profile.objects.filter(bio_text__contains=query)
-            )
+            profiles = profile_page.object_list
+            posts = context["object_list"]
 
-        # provide profiles that match the query as context
+        # provide profiles and posts that match the query as context
         context["profiles"] = profiles
+        context["posts"] = posts
 
         # provide number of result profiles and posts as context
-        context["numProfiles"] = profiles.count()
-        context["numPosts"] = posts.count()
+        context["numProfiles"] = profile_page.paginator.count
+        context["numPosts"] = context["paginator"].count
 
         return context
 
@@ -0,0 +1,86 @@
+# voter_analytics/bitmaps.py
+# bitmap indexes over the low-cardinality voter columns, packed 8 rows a byte
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/16/2025
+
+import numpy as np
+
+
+class Bitmap:
+    """
+    A set of row positions in the VoterCube, stored as a packed bit array
+    (one bit per voter). Bitmaps combine with & (and), | (or) and ~ (not).
+    """
+
+    def __init__(self, bits, size):
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Pack a boolean array into a Bitmap."""
+        return cls(np.packbits(mask), len(mask))
+
+    @classmethod
+    def full(cls, size):
+        """Return a Bitmap with every row set."""
+        return cls.from_mask(np.ones(size, dtype=bool))
+
+    def __and__(self, other):
+        return Bitmap(self.bits & other.bits, self.size)
+
+    def __or__(self, other):
+        return Bitmap(self.bits | other.bits, self.size)
+
+    def __invert__(self):
+        bits = ~self.bits
+        # clear the padding bits past the last row
+        padding = -self.size % 8
+        if padding:
+            bits[-1] &= (0xFF << padding) & 0xFF
+        return Bitmap(bits, self.size)
+
+    def to_mask(self):
+        """Unpack into a boolean array with one entry per row."""
+        return np.unpackbits(self.bits, count=self.size).astype(bool)
+
+
+class BitmapIndex:
+    """
+    One Bitmap per election flag, per party and per voter score, built from
+    the columns of a VoterCube and rebuilt along with it.
+    """
+
+    def __init__(self, cube, elections):
+        self.size = len(cube.ids)
+        self.elections = {
+            election: Bitmap.from_mask(cube.votes & (1 << i) != 0)
+            for i, election in enumerate(elections)
+        }
+        self.parties = {
+            party: Bitmap.from_mask(cube.party_codes == code)
+            for code, party in enumerate(cube.parties)
+        }
+        self.scores = {
+            int(score): Bitmap.from_mask(cube.scores == score)
+            for score in np.unique(cube.scores)
+        }
+
+    def all(self):
+        """Return a Bitmap of every voter."""
+        return Bitmap.full(self.size)
+
+    def none(self):
+        """Return an empty Bitmap."""
+        return Bitmap.from_mask(np.zeros(self.size, dtype=bool))
+
+    def voted(self, election):
+        """Return the voters who voted in election."""
+        return self.elections[election]
+
+    def party(self, party_affiliation):
+        """Return the voters registered with party_affiliation."""
+        return self.parties.get(party_affiliation) or self.none()
+
+    def score(self, voter_score):
+        """Return the voters with exactly voter_score."""
+        return self.scores.get(voter_score) or self.none()
@@ -0,0 +1,168 @@
+# voter_analytics/cube.py
+# columnar in-memory copy of the Voter table for filtered analytics
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/15/2025
+
+import threading
+from functools import reduce
+from operator import or_
+import numpy as np
+from .bitmaps import Bitmap, BitmapIndex
+from .models import Voter, get_data_version
+
+ELECTIONS = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
+TRUE_VALUES = ("on", "true", "True", "1")
+
+
+class VoterCube:
+    """
+    The filterable columns of every Voter, one NumPy array per column.
+    Party is stored as a category code into self.parties, and the five
+    election flags are packed into one uint8 with bit i for ELECTIONS[i].
+    """
+
+    def __init__(self, version, ids, parties, party_codes, birth_years, scores, votes):
+        self.version = version
+        self.ids = ids
+        self.parties = parties
+        self.party_codes = party_codes
+        self.birth_years = birth_years
+        self.scores = scores
+        self.votes = votes
+        self.index = BitmapIndex(self, ELECTIONS)
+
+    @classmethod
+    def build(cls):
+        """Load the columns of the Voter table into a new cube."""
+        version = get_data_version()
+        rows = list(
+            Voter.objects.order_by("id").values_list(
+                "id", "party_affiliation", "birth_year", "voter_score", *ELECTIONS
+            )
+        )
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        parties, party_codes = np.unique(
+            np.array([row[1] for row in rows], dtype=object), return_inverse=True
+        )
+        birth_years = np.fromiter((row[2] for row in rows), np.int16, len(rows))
+        scores = np.fromiter((row[3] for row in rows), np.int8, len(rows))
+        votes = np.fromiter(
+            (sum(1 << i for i, voted in enumerate(row[4:]) if voted) for row in rows),
+            np.uint8,
+            len(rows),
+        )
+
+        return cls(
+            version,
+            ids,
+            list(parties),
+            party_codes.astype(np.min_scalar_type(len(parties))),
+            birth_years,
+            scores,
+            votes,
+        )
+
+    def select(self, params):
+        """
+        Return a Bitmap of the voters that match the search parameters (a
+        QueryDict), with the same meaning as VoterFilterMixin.get_queryset.
+        Several parties or scores are the union of their bitmaps, and the
+        party, score and election filters are intersected.
+        """
+        index = self.index
+        selected = index.all()
+
+        parties = [party for party in params.getlist("party_affiliation") if party]
+        if parties:
+            selected &= reduce(or_, (index.party(party) for party in parties))
+
+        scores = [score for score in params.getlist("voter_score") if score]
+        if scores:
+            selected &= reduce(or_, (index.score(int(score)) for score in scores))
+
+        for election in ELECTIONS:
+            election_result = params.get(election)
+            if election_result:
+                if election_result in TRUE_VALUES:
+                    selected &= index.voted(election)
+                else:
+                    selected &= ~index.voted(election)
+
+        # birth year is a range, so it is compared directly
+        min_dob = params.get("min_dob")
+        max_dob = params.get("max_dob")
+        if min_dob or max_dob:
+            in_range = np.ones(len(self.ids), dtype=bool)
+            if min_dob:
+                in_range &= self.birth_years >= int(min_dob)
+            if max_dob:
+                in_range &= self.birth_years <= int(max_dob)
+            selected &= Bitmap.from_mask(in_range)
+
+        return selected
+
+    def mask(self, params):
+        """Return a boolean array selecting the voters that match params."""
+        return self.select(params).to_mask()
+
+    def matching_ids(self, selected):
+        """
+        Return the ids of the selected voters in id order.
+        selected is a boolean mask or a Bitmap.
+        """
+        if isinstance(selected, Bitmap):
+            selected = selected.to_mask()
+        return self.ids[selected]
+
+    def summary(self, mask):
+        """
+        Summarize the selected voters in the same shape as
+        views.get_voter_summary, using bincount instead of SQL.
+        """
+        party_counts = np.bincount(self.party_codes[mask], minlength=len(self.parties))
+
+        years = self.birth_years[mask]
+        birth_years = {}
+        if len(years):
+            low = int(years.min())
+            year_counts = np.bincount(years - low)
+            birth_years = {
+                low + int(i): int(year_counts[i]) for i in np.flatnonzero(year_counts)
+            }
+
+        # count every combination of flags, then add up the ones with bit i set
+        vote_counts = np.bincount(self.votes[mask], minlength=1 << len(ELECTIONS))
+        combos = np.arange(len(vote_counts))
+        elections = {
+            election: int(vote_counts[(combos >> i) & 1 == 1].sum())
+            for i, election in enumerate(ELECTIONS)
+        }
+
+        return {
+            "total": int(mask.sum()),
+            "elections": elections,
+            "parties": {
+                party: int(count)
+                for party, count in zip(self.parties, party_counts)
+                if count
+            },
+            "birth_years": birth_years,
+        }
+
+
+_cube = None
+_lock = threading.Lock()
+
+
+def get_cube():
+    """
+    Return the process-wide VoterCube, rebuilding it when the voter data
+    version has changed since it was built.
+    """
+    global _cube
+    version = get_data_version()
+    if _cube is None or _cube.version != version:
+        with _lock:
+            if _cube is None or _cube.version != version:
+                _cube = VoterCube.build()
+    return _cube
@@ -46,10 +46,13 @@ class VoterSearchForm(forms.Form):
     ]
 
     # fields of the form
-    party_affiliation = forms.ChoiceField(choices=PARTY_CHOICES, required=False)
+    # several parties or scores match voters with any of them
+    party_affiliation = forms.MultipleChoiceField(
+        choices=PARTY_CHOICES[1:], required=False
+    )
     min_dob = forms.ChoiceField(choices=YEAR_CHOICES, required=False)
     max_dob = forms.ChoiceField(choices=YEAR_CHOICES, required=False)
-    voter_score = forms.ChoiceField(choices=SCORE_CHOICES, required=False)
+    voter_score = forms.MultipleChoiceField(choices=SCORE_CHOICES[1:], required=False)
 
     v20state = forms.BooleanField(required=False, label="2020 State")
     v21town = forms.BooleanField(required=False, label="2021 Town")
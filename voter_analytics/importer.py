@@ -0,0 +1,172 @@
+# voter_analytics/importer.py
+# streaming CSV importer for the voter analytics application
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/12/2025
+
+import csv
+import hashlib
+from datetime import date
+from django.db import transaction
+from cs412.importing import batches, delete_rows
+from .models import Voter, bump_data_version
+
+DEFAULT_BATCH_SIZE = 2000
+ELECTIONS = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
+
+# fields copied from the CSV; content_hash is computed over these
+DATA_FIELDS = [
+    "voter_id",
+    "last_name",
+    "first_name",
+    "residential_address",
+    "date_of_birth",
+    "date_of_registration",
+    "party_affiliation",
+    "precinct_number",
+    *ELECTIONS,
+    "voter_score",
+]
+
+
+def parse_bool(value):
+    """Convert a TRUE/FALSE column of the CSV to a bool."""
+    value = value.strip().upper()
+    if value in ("TRUE", "T", "1"):
+        return True
+    if value in ("FALSE", "F", "0"):
+        return False
+    raise ValueError(f"invalid boolean {value!r}")
+
+
+def parse_voter(fields):
+    """Build an unsaved Voter from one row of the Newton voter CSV."""
+    if len(fields) < 17:
+        raise ValueError(f"expected 17 columns, got {len(fields)}")
+
+    voter = Voter(
+        voter_id=fields[0].strip(),
+        last_name=fields[1],
+        first_name=fields[2],
+        residential_address=fields[3] + " " + fields[4],
+        date_of_birth=date.fromisoformat(fields[7].strip()),
+        date_of_registration=date.fromisoformat(fields[8].strip()),
+        party_affiliation=fields[9],
+        precinct_number=fields[10],
+        voter_score=int(fields[16]),
+    )
+    voter.birth_year = voter.date_of_birth.year
+    for i, election in enumerate(ELECTIONS):
+        setattr(voter, election, parse_bool(fields[11 + i]))
+
+    voter.content_hash = content_hash(voter)
+    return voter
+
+
+def content_hash(voter):
+    """Return a SHA-1 hex digest of the imported fields of voter."""
+    values = "\x1f".join(str(getattr(voter, field)) for field in DATA_FIELDS)
+    return hashlib.sha1(values.encode()).hexdigest()
+
+
+def read_voters(filename, rejects):
+    """
+    Yield unsaved Voters from the CSV file one row at a time.
+    Rows that cannot be parsed, or repeat an earlier voter_id, are appended
+    to rejects as (line number, row, error) instead of stopping the import.
+    """
+    voter_ids = set()
+    with open(filename, "r", newline="") as f:
+        reader = csv.reader(f)
+
+        # discard headers
+        next(reader, None)
+
+        for fields in reader:
+            try:
+                voter = parse_voter(fields)
+                if voter.voter_id in voter_ids:
+                    raise ValueError(f"duplicate voter_id {voter.voter_id!r}")
+            except ValueError as e:
+                rejects.append((reader.line_num, fields, e))
+                continue
+            voter_ids.add(voter.voter_id)
+            yield voter
+
+
+def load_voters(filename, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Replace the Voter table with the records in filename.
+    Rows are written with bulk_create, one transaction per batch.
+    progress, if given, is called as progress(created, rejected) after each batch.
+    Return the number of voters created and the list of rejected rows.
+    """
+    rejects = []
+    created = 0
+
+    delete_rows(Voter.objects.all())
+
+    for batch in batches(read_voters(filename, rejects), batch_size):
+        with transaction.atomic():
+            Voter.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+        if progress:
+            progress(created, len(rejects))
+
+    bump_data_version()
+    return created, rejects
+
+
+def sync_voters(filename, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Bring the Voter table in line with filename without rebuilding it.
+    Rows are matched on voter_id and compared by content_hash: new voters
+    are inserted, changed voters are bulk-updated, and voters missing from
+    the file are deleted. A voter whose row is rejected is left as it is
+    rather than deleted. Everything happens in a single transaction, so
+    readers see either the old roll or the new one.
+    progress, if given, is called as progress(seen, rejected) after each batch.
+    Return the numbers created, updated and deleted, and the rejected rows.
+    """
+    rejects = []
+    created = updated = seen = 0
+
+    with transaction.atomic():
+        existing = {
+            voter_id: (pk, digest)
+            for pk, voter_id, digest in Voter.objects.values_list(
+                "pk", "voter_id", "content_hash"
+            ).iterator()
+        }
+
+        for batch in batches(read_voters(filename, rejects), batch_size):
+            to_create = []
+            to_update = []
+            for voter in batch:
+                match = existing.pop(voter.voter_id, None)
+                if match is None:
+                    to_create.append(voter)
+                elif match[1] != voter.content_hash:
+                    voter.pk = match[0]
+                    to_update.append(voter)
+
+            Voter.objects.bulk_create(to_create, batch_size=batch_size)
+            Voter.objects.bulk_update(
+                to_update,
+                [*DATA_FIELDS, "birth_year", "content_hash"],
+                batch_size=batch_size,
+            )
+            created += len(to_create)
+            updated += len(to_update)
+            seen += len(batch)
+
+            if progress:
+                progress(seen, len(rejects))
+
+        # whatever is left in existing was not in the file, or was rejected
+        kept = {fields[0].strip() for _, fields, _ in rejects if fields}
+        missing = [pk for voter_id, (pk, _) in existing.items() if voter_id not in kept]
+        for ids in batches(missing, batch_size):
+            delete_rows(Voter.objects.filter(pk__in=ids))
+
+    bump_data_version()
+    return created, updated, len(missing), rejects
@@ -0,0 +1,53 @@
+# voter_analytics/management/commands/load_voters.py
+# management command to load the Newton voter CSV into the database
+# Author: Yihang Duanmu (harrydm@bu.edu), 12/12/2025
+
+from django.core.management.base import BaseCommand, CommandError
+from voter_analytics.importer import DEFAULT_BATCH_SIZE, load_voters, sync_voters
+
+
+class Command(BaseCommand):
+    help = "Load voter records from the Newton voter CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("filename", help="path to the voter CSV file")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"rows per bulk insert (default {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="update only new, changed and removed voters in one transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        def progress(count, rejected):
+            self.stdout.write(f"Processed {count} voters ({rejected} rejected)")
+
+        try:
+            if options["incremental"]:
+                created, updated, deleted, rejects = sync_voters(
+                    options["filename"], options["batch_size"], progress
+                )
+                self.stdout.write(f"Updated {updated}, deleted {deleted} Voters data")
+            else:
+                created, rejects = load_voters(
+                    options["filename"], options["batch_size"], progress
+                )
+        except OSError as e:
+            raise CommandError(e)
+
+        for line_num, fields, error in rejects:
+            self.stderr.write(f"Rejected line {line_num}: {error}: {','.join(fields)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. Created {created} Voters data, rejected {len(rejects)}"
+            )
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2025-12-13 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0002_alter_voter_party_affiliation_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voter",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AlterField(
+            model_name="voter",
+            name="voter_id",
+            field=models.CharField(db_index=True, max_length=12),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.6 on 2025-12-17 10:42
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+
+
+def fill_birth_year(apps, schema_editor):
+    """Copy the year of date_of_birth into birth_year for existing voters."""
+    Voter = apps.get_model("voter_analytics", "Voter")
+    Voter.objects.update(birth_year=ExtractYear("date_of_birth"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0003_voter_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voter",
+            name="birth_year",
+            field=models.IntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_birth_year, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["party_affiliation", "voter_score", "birth_year"],
+                name="voter_party_score_year_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                fields=["voter_score", "birth_year"], name="voter_score_year_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["birth_year"], name="voter_birth_year_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(fields=["precinct_number"], name="voter_precinct_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v20state", True)),
+                fields=["birth_year"],
+                name="voter_v20state_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v21town", True)),
+                fields=["birth_year"],
+                name="voter_v21town_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v21primary", True)),
+                fields=["birth_year"],
+                name="voter_v21primary_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v22general", True)),
+                fields=["birth_year"],
+                name="voter_v22general_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v23town", True)),
+                fields=["birth_year"],
+                name="voter_v23town_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2025-12-30 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voter_analytics", "0004_voter_birth_year_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v20state", True)),
+                fields=["id"],
+                name="voter_v20state_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v21town", True)),
+                fields=["id"],
+                name="voter_v21town_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v21primary", True)),
+                fields=["id"],
+                name="voter_v21primary_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v22general", True)),
+                fields=["id"],
+                name="voter_v22general_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voter",
+            index=models.Index(
+                condition=models.Q(("v23town", True)),
+                fields=["id"],
+                name="voter_v23town_id_idx",
+            ),
+        ),
+    ]
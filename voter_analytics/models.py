@@ -3,6 +3,9 @@
 # Author: Yihang Duanmu (harrydm@bu.edu), 10/28/2025
 
 from django.db import models
+from cs412.versions import bump_version, get_version
+
+DATA_VERSION_KEY = "voter_analytics:data_version"
 
 
 # Create your models here.
@@ -15,11 +18,13 @@ class Voter(models.Model):
     """
 
     # Personal information fields
-    voter_id = models.CharField(max_length=12)
+    voter_id = models.CharField(max_length=12, db_index=True)
     last_name = models.TextField()
     first_name = models.TextField()
     residential_address = models.TextField()
     date_of_birth = models.DateField()
+    # year of date_of_birth, stored so the year filters can use an index
+    birth_year = models.IntegerField()
 
     # Voting related information fields
     date_of_registration = models.DateField()
@@ -32,49 +37,72 @@ class Voter(models.Model):
     v23town = models.BooleanField()
     voter_score = models.IntegerField()
 
+    # hash of the imported CSV fields, used to detect changed rows
+    content_hash = models.CharField(max_length=40, blank=True)
+
+    class Meta:
+        indexes = [
+            # composite indexes matching the VoterSearchForm filters
+            models.Index(
+                fields=["party_affiliation", "voter_score", "birth_year"],
+                name="voter_party_score_year_idx",
+            ),
+            models.Index(
+                fields=["voter_score", "birth_year"], name="voter_score_year_idx"
+            ),
+            models.Index(fields=["birth_year"], name="voter_birth_year_idx"),
+            models.Index(fields=["precinct_number"], name="voter_precinct_idx"),
+        ] + [
+            # partial indexes per election, covering only the voters who voted:
+            # in birth year order for date of birth filters and in id order
+            # for the unfiltered list
+            models.Index(
+                fields=[field],
+                condition=models.Q(**{election: True}),
+                name=f"voter_{election}{suffix}_idx",
+            )
+            for election in [
+                "v20state",
+                "v21town",
+                "v21primary",
+                "v22general",
+                "v23town",
+            ]
+            for field, suffix in [("birth_year", ""), ("id", "_id")]
+        ]
+
     def __str__(self):
         """Return a string representation of this model instance."""
         return f"{self.first_name} {self.last_name} from ({self.residential_address}"
 
+    def save(self, *args, **kwargs):
+        """Keep birth_year in step with date_of_birth."""
+        self.birth_year = self.date_of_birth.year
+        super().save(*args, **kwargs)
 
-def load_data():
-    """Funtion to load data records from csv file into Django database"""
 
-    Voter.objects.all().delete()
-
-    filename = "/Users/apple/django/newton_voters.csv"
-    f = open(filename, "r")  # open the file for reading
-
-    # discard headers
-    f.readline()
-
-    # read several rows
-    for line in f:
-        fields = line.strip().split(",")
-
-        # create a new instance of Result object with this record from CSV
-        try:
-            voter = Voter(
-                voter_id=fields[0],
-                last_name=fields[1],
-                first_name=fields[2],
-                residential_address=fields[3] + " " + fields[4],
-                date_of_birth=fields[7],
-                date_of_registration=fields[8],
-                party_affiliation=fields[9],
-                precinct_number=fields[10],
-                v20state=fields[11].capitalize(),
-                v21town=fields[12].capitalize(),
-                v21primary=fields[13].capitalize(),
-                v22general=fields[14].capitalize(),
-                v23town=fields[15].capitalize(),
-                voter_score=fields[16],
-            )
+def get_data_version():
+    """Return a token that changes whenever the Voter table changes."""
+    return get_version(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """Mark every cache derived from the Voter table as stale."""
+    bump_version(DATA_VERSION_KEY)
+
+
+def load_data(filename, batch_size=2000, incremental=False):
+    """Funtion to load data records from csv file into Django database"""
+    from .importer import load_voters, sync_voters
 
-            voter.save()
+    if incremental:
+        created, updated, deleted, rejects = sync_voters(filename, batch_size)
+        print(f"Updated {updated} and deleted {deleted} Voters data")
+    else:
+        created, rejects = load_voters(filename, batch_size)
 
-        except Exception as e:
-            print("Something went wrong:")
-            print(f"line={line}")
+    for line_num, fields, error in rejects:
+        print("Something went wrong:")
+        print(f"line {line_num}={','.join(fields)} ({error})")
 
-    print(f"Done. Created {len(Voter.objects.all())} Voters data")
+    print(f"Done. Created {created} Voters data")
@@ -0,0 +1,13 @@
+# voter_analytics/signals.py
+# signal handlers keeping the voter_analytics caches current
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Voter, bump_data_version
+
+
+@receiver(post_save, sender=Voter)
+@receiver(post_delete, sender=Voter)
+def voter_changed(sender, **kwargs):
+    """Rebuild the cube and charts after a voter is edited, added or deleted"""
+    bump_data_version()
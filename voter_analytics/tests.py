@@ -1,3 +1,293 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+import time
+from datetime import date
+from itertools import combinations
+import numpy as np
+from django.core.cache import cache, caches
+from unittest import mock
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from cs412.pagination import KeysetPaginator
+from .bitmaps import Bitmap
+from .cube import get_cube
+from .forms import VoterSearchForm
+from .importer import ELECTIONS, load_voters, sync_voters
+from .models import DATA_VERSION_KEY, Voter
+from .views import VoterListView
 
-# Create your tests here.
+# a sample value for every VoterSearchForm field
+SAMPLE_PARAMS = {
+    "party_affiliation": "D ",
+    "min_dob": "1960",
+    "max_dob": "1990",
+    "voter_score": "3",
+    "v20state": "on",
+    "v21town": "on",
+    "v21primary": "on",
+    "v22general": "on",
+    "v23town": "on",
+}
+
+
+class VoterSearchIndexTests(TestCase):
+    """Check that the voter search filters are answered from an index"""
+
+    def test_search_fields_have_sample_values(self):
+        self.assertEqual(set(SAMPLE_PARAMS), set(VoterSearchForm.base_fields))
+
+    def test_every_filter_combination_uses_an_index(self):
+        factory = RequestFactory()
+        fields = list(SAMPLE_PARAMS)
+        for n in range(1, len(fields) + 1):
+            for combo in combinations(fields, n):
+                view = VoterListView()
+                view.request = factory.get("/", {f: SAMPLE_PARAMS[f] for f in combo})
+                # the queries the view runs for the first and a following page
+                paginator = KeysetPaginator(
+                    view.get_queryset(), view.paginate_by, view.get_keyset_ordering()
+                )
+                cursor = [1960, 1] if "birth_year" in paginator.keys else [1]
+                pages = [
+                    paginator.queryset[: view.paginate_by + 1],
+                    paginator.seek(cursor, "gt")[: view.paginate_by + 1],
+                ]
+                # a partial election index holds only the voters who voted,
+                # so scanning it reads just the matching rows
+                partial = [
+                    f"USING INDEX voter_{f}_id_idx" for f in combo if f in ELECTIONS
+                ]
+                for page, queryset in enumerate(pages):
+                    plan = queryset.explain()
+                    with self.subTest(filters=combo, page=page):
+                        for line in plan.splitlines():
+                            if "voter_analytics_voter" not in line:
+                                continue
+                            if "SCAN" in line:
+                                self.assertEqual(page, 0, plan)
+                                self.assertTrue(
+                                    any(line.endswith(index) for index in partial),
+                                    plan,
+                                )
+                            else:
+                                self.assertIn("SEARCH", line, plan)
+
+
+class VoterCubeVersionTests(TestCase):
+    """Check that the cube follows the data version shared between processes"""
+
+    def test_cube_rebuilds_after_another_process_loads_voters(self):
+        cube = get_cube()
+        self.assertIs(get_cube(), cube)
+        # another process shares only the versions cache with this one
+        cache.clear()
+        caches["versions"].set(DATA_VERSION_KEY, time.time_ns(), None)
+        self.assertIsNot(get_cube(), cube)
+
+
+def voter_row(voter_id, last_name="Smith", dob="1980-01-02"):
+    """Return a row of the Newton voter CSV."""
+    return (
+        f"{voter_id},{last_name},Alex,12,Walnut St,,02458,{dob},2000-01-02,"
+        "D ,1A,TRUE,FALSE,TRUE,FALSE,TRUE,3"
+    ).split(",")
+
+
+class VoterSyncTests(TestCase):
+    """Check that sync_voters applies the differences to the voter roll"""
+
+    def write_csv(self, rows):
+        f = tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            writer = csv.writer(f)
+            writer.writerow(["Voter ID Number"])
+            writer.writerows(rows)
+        return f.name
+
+    def test_rejected_and_duplicate_rows_keep_existing_voters(self):
+        load_voters(self.write_csv([voter_row(f"V{i}") for i in range(4)]))
+        rows = [
+            voter_row("V0"),
+            voter_row("V1", last_name="Jones"),
+            voter_row("V2", dob="not a date"),
+            voter_row("V4"),
+            voter_row("V4", last_name="Jones"),
+        ]
+
+        created, updated, deleted, rejects = sync_voters(self.write_csv(rows))
+
+        self.assertEqual((created, updated, deleted), (1, 1, 1))
+        self.assertEqual([line for line, _, _ in rejects], [4, 6])
+        self.assertEqual(
+            dict(Voter.objects.values_list("voter_id", "last_name")),
+            {"V0": "Smith", "V1": "Jones", "V2": "Smith", "V4": "Smith"},
+        )
+
+    def test_imports_bump_the_version_once(self):
+        load_voters(self.write_csv([voter_row(f"V{i}") for i in range(4)]))
+        with mock.patch("voter_analytics.importer.bump_data_version") as bump:
+            with mock.patch("voter_analytics.signals.bump_data_version") as signal:
+                load_voters(self.write_csv([voter_row("V0")]))
+                sync_voters(self.write_csv([voter_row("V1")]))
+        self.assertEqual(bump.call_count, 2)
+        signal.assert_not_called()
+        self.assertEqual(list(Voter.objects.values_list("voter_id", flat=True)), ["V1"])
+
+
+class VoterListPagingTests(TestCase):
+    """Check that the cube and SQL lists page through voters in the same order"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, year in enumerate([1970, 1950, 1990, 1950, 1965, 1980, 1950]):
+            Voter.objects.create(
+                voter_id=f"V{i}",
+                last_name="Smith",
+                first_name="Alex",
+                residential_address="12 Walnut St",
+                date_of_birth=date(year, 1, 2),
+                date_of_registration=date(2000, 1, 2),
+                party_affiliation="D ",
+                precinct_number="1A",
+                v20state=i % 2 == 0,
+                v21town=False,
+                v21primary=False,
+                v22general=False,
+                v23town=False,
+                voter_score=1,
+            )
+
+    def walk(self, params):
+        """Return the voter ids of every page, following the next cursors."""
+        ids, cursor = [], None
+        while True:
+            page_params = dict(params, after=cursor) if cursor else params
+            response = self.client.get(reverse("voters"), page_params)
+            self.assertEqual(response.status_code, 200)
+            page = response.context["page_obj"]
+            ids.extend(voter.voter_id for voter in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                return ids
+
+    @mock.patch.object(VoterListView, "paginate_by", 2)
+    def test_cube_and_sql_pages_match(self):
+        for params in [{}, {"min_dob": "1955"}, {"max_dob": "1975", "v20state": "on"}]:
+            with self.subTest(params=params):
+                with self.settings(VOTER_CUBE=True):
+                    cube = self.walk(params)
+                with self.settings(VOTER_CUBE=False):
+                    sql = self.walk(params)
+                self.assertEqual(cube, sql)
+                self.assertEqual(len(cube), len(set(cube)))
+
+        self.assertEqual(self.walk({"max_dob": "1960"}), ["V1", "V3", "V6"])
+
+
+class BitmapTests(TestCase):
+    """Check the set operations of packed Bitmaps"""
+
+    # 10 rows leave 6 padding bits in the last byte
+    a = np.array([1, 1, 0, 0, 1, 0, 1, 0, 0, 1], dtype=bool)
+    b = np.array([1, 0, 1, 0, 0, 0, 1, 1, 0, 1], dtype=bool)
+
+    def test_and_or(self):
+        x, y = Bitmap.from_mask(self.a), Bitmap.from_mask(self.b)
+        self.assertEqual(list((x & y).to_mask()), list(self.a & self.b))
+        self.assertEqual(list((x | y).to_mask()), list(self.a | self.b))
+
+    def test_invert_clears_padding(self):
+        inverted = ~Bitmap.from_mask(self.a)
+        self.assertEqual(list(inverted.to_mask()), list(~self.a))
+        self.assertEqual(int(inverted.bits[-1]) & 0x3F, 0)
+        self.assertEqual(list((~inverted).to_mask()), list(self.a))
+        self.assertFalse((~Bitmap.full(10)).to_mask().any())
+
+
+class VoterCubeSelectTests(TestCase):
+    """Check that the cube selects the same voters as the SQL filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(40):
+            Voter.objects.create(
+                voter_id=f"V{i}",
+                last_name="Smith",
+                first_name="Alex",
+                residential_address="12 Walnut St",
+                date_of_birth=date(1940 + i * 7 % 60, 1, 2),
+                date_of_registration=date(2000, 1, 2),
+                party_affiliation=["D ", "R ", "U "][i % 3],
+                precinct_number="1A",
+                v20state=i % 2 == 0,
+                v21town=i % 5 == 0,
+                v21primary=False,
+                v22general=i % 3 != 1,
+                v23town=i % 4 == 0,
+                voter_score=i % 6,
+            )
+
+    def test_select_matches_sql(self):
+        factory = RequestFactory()
+        queries = [
+            "",
+            "party_affiliation=D+",
+            "party_affiliation=D+&party_affiliation=R+",
+            "voter_score=3&voter_score=4&voter_score=5",
+            "v20state=on&v22general=on&party_affiliation=D+&voter_score=3"
+            "&voter_score=4&voter_score=5",
+            "min_dob=1960&max_dob=1990&v23town=on",
+            "v21primary=on",
+        ]
+        cube = get_cube()
+        for query in queries:
+            with self.subTest(query=query):
+                view = VoterListView()
+                view.request = factory.get(f"/?{query}")
+                expected = sorted(view.get_queryset().values_list("pk", flat=True))
+                selected = cube.select(QueryDict(query))
+                self.assertEqual(list(cube.matching_ids(selected)), expected)
+
+
+class ChartVersionTests(TestCase):
+    """Check that cached graphs are rebuilt after the voters change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.voters = [
+            Voter.objects.create(
+                voter_id=f"V{i}",
+                last_name="Smith",
+                first_name="Alex",
+                residential_address="12 Walnut St",
+                date_of_birth=date(1960 + i, 1, 2),
+                date_of_registration=date(2000, 1, 2),
+                party_affiliation="D ",
+                precinct_number="1A",
+                v20state=True,
+                v21town=False,
+                v21primary=False,
+                v22general=False,
+                v23town=False,
+                voter_score=1,
+            )
+            for i in range(3)
+        ]
+
+    def birth_date_chart(self):
+        response = self.client.get(reverse("graphs"))
+        return response.context["graph_div_birth_date"]
+
+    def test_graphs_rebuilt_after_edit_and_delete(self):
+        self.assertIn("n = 3", self.birth_date_chart())
+
+        voter = self.voters[0]
+        voter.date_of_birth = date(1901, 1, 2)
+        voter.save()
+        self.assertIn("1901", self.birth_date_chart())
+
+        voter.delete()
+        self.assertIn("n = 2", self.birth_date_chart())
@@ -2,53 +2,87 @@
 # views for the voter analytics application
 # Author: Yihang Duanmu (harrydm@bu.edu), 10/28/2025
 
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import Http404
 from django.db.models.query import QuerySet
 from django.shortcuts import render
 from django.views.generic import ListView, DetailView
-from django.db.models.functions import ExtractYear
-from django.db.models import Count
-from .models import Voter
+from django.db.models import Count, Q
+from cs412.charts import cached_charts, chart_cache_key, render_chart
+from cs412.pagination import KeysetPage, KeysetPaginationMixin
+from .models import Voter, get_data_version
 from .forms import VoterSearchForm
-import plotly
+from .cube import get_cube
+import numpy as np
 import plotly.graph_objs as go
 
+ELECTIONS = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
+
+
+def get_voter_summary(queryset):
+    """
+    Summarize a filtered voter queryset for the graphs page in two queries:
+    one grouped by party with conditional election counts, one grouped by
+    year of birth. No Voter instances are created.
+    """
+    by_party = (
+        queryset.order_by("party_affiliation")
+        .values("party_affiliation")
+        .annotate(
+            count=Count("id"),
+            **{
+                election: Count("id", filter=Q(**{election: True}))
+                for election in ELECTIONS
+            },
+        )
+    )
+    by_party = list(by_party)
 
-class VoterListView(ListView):
-    """View to display voter records"""
+    birth_years = (
+        queryset.order_by("birth_year").values("birth_year").annotate(count=Count("id"))
+    )
+
+    return {
+        "total": sum(item["count"] for item in by_party),
+        "elections": {
+            election: sum(item[election] for item in by_party) for election in ELECTIONS
+        },
+        "parties": {item["party_affiliation"]: item["count"] for item in by_party},
+        "birth_years": {item["birth_year"]: item["count"] for item in birth_years},
+    }
 
-    model = Voter
-    template_name = "voter_analytics/records.html"
-    context_object_name = "records"
-    paginate_by = 100
+
+class VoterFilterMixin:
+    """Filter voter records by the VoterSearchForm URL parameters"""
 
     def get_queryset(self):
         """handle searching for records"""
-        records = super().get_queryset()
+        records = Voter.objects.all()
 
         # look for URL parameters to filter by
         params = self.request.GET
 
-        # filter party affiliation
-        party_affiliation = params.get("party_affiliation")
-        if party_affiliation:
-            records = records.filter(party_affiliation=party_affiliation)
+        # filter party affiliation, any of those selected
+        parties = [party for party in params.getlist("party_affiliation") if party]
+        if parties:
+            records = records.filter(party_affiliation__in=parties)
 
         # filter date of birth
         min_dob = params.get("min_dob")
         max_dob = params.get("max_dob")
         if min_dob:
-            records = records.filter(date_of_birth__year__gte=min_dob)
+            records = records.filter(birth_year__gte=min_dob)
         if max_dob:
-            records = records.filter(date_of_birth__year__lte=max_dob)
+            records = records.filter(birth_year__lte=max_dob)
 
-        # filter voter score
-        voter_score = params.get("voter_score")
-        if voter_score:
-            records = records.filter(voter_score=voter_score)
+        # filter voter score, any of those selected
+        scores = [score for score in params.getlist("voter_score") if score]
+        if scores:
+            records = records.filter(voter_score__in=scores)
 
-        # filter voter score
-        elections = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
-        for election in elections:
+        # filter elections voted in
+        for election in ELECTIONS:
             election_result = params.get(election)
             if election_result:
                 if election_result == "on":
@@ -57,6 +91,81 @@ class VoterListView(ListView):
 
         return records
 
+    def use_cube(self):
+        """Return True if requests should be answered from the VoterCube."""
+        return getattr(settings, "VOTER_CUBE", True)
+
+
+class VoterListView(VoterFilterMixin, KeysetPaginationMixin, ListView):
+    """View to display voter records"""
+
+    model = Voter
+    template_name = "voter_analytics/records.html"
+    context_object_name = "records"
+    paginate_by = 100
+    query_budget = 4
+
+    def get_keyset_ordering(self):
+        """order by birth year when filtering by it, so the range seeks an index"""
+        params = self.request.GET
+        if params.get("min_dob") or params.get("max_dob"):
+            return "birth_year"
+        return "pk"
+
+    def paginate_queryset(self, queryset, page_size):
+        """seek into the matching ids from the cube, then load one page of voters"""
+        if not self.use_cube():
+            return super().paginate_queryset(queryset, page_size)
+
+        cube = get_cube()
+        mask = cube.mask(self.request.GET)
+        ids = cube.matching_ids(mask)
+        by_year = self.get_keyset_ordering() == "birth_year"
+        if by_year:
+            # order by (birth_year, id) like the SQL path, as one sortable key
+            years = cube.birth_years[mask].astype(np.int64)
+            keys = np.sort(years << 32 | ids)
+            ids = keys & 0xFFFFFFFF
+        else:
+            keys = ids
+
+        def decode(cursor):
+            if by_year:
+                year, pk = cursor.split(":")
+                return int(year) << 32 | int(pk)
+            return int(cursor)
+
+        def encode(i):
+            if by_year:
+                return f"{int(keys[i]) >> 32}:{int(ids[i])}"
+            return str(int(ids[i]))
+
+        try:
+            after = self.request.GET.get("after")
+            before = self.request.GET.get("before")
+            if before:
+                end = int(np.searchsorted(keys, decode(before), "left"))
+                start = max(end - page_size, 0)
+            else:
+                start = (
+                    int(np.searchsorted(keys, decode(after), "right")) if after else 0
+                )
+                end = min(start + page_size, len(ids))
+        except ValueError:
+            raise Http404("Invalid cursor")
+
+        page_ids = [int(pk) for pk in ids[start:end]]
+        voters = Voter.objects.in_bulk(page_ids)
+        records = [voters[pk] for pk in page_ids if pk in voters]
+
+        page = KeysetPage(
+            records,
+            Paginator(ids, page_size),
+            encode(start) if page_ids and start > 0 else None,
+            encode(end - 1) if page_ids and end < len(ids) else None,
+        )
+        return (page.paginator, page, page.object_list, page.has_other_pages())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         search_form = VoterSearchForm(self.request.GET or None)
@@ -72,116 +181,77 @@ class VoterDetailView(DetailView):
     template_name = "voter_analytics/record_detail.html"
 
 
-class GraphListView(ListView):
+class GraphListView(VoterFilterMixin, ListView):
     """View to display summary graphs"""
 
     model = Voter
     template_name = "voter_analytics/graphs.html"
     context_object_name = "records"
-    paginate_by = 100
-
-    def get_queryset(self):
-        """handle searching for records"""
-        records = super().get_queryset()
-
-        # look for URL parameters to filter by
-        params = self.request.GET
-
-        # filter party affiliation
-        party_affiliation = params.get("party_affiliation")
-        if party_affiliation:
-            records = records.filter(party_affiliation=party_affiliation)
-
-        # filter date of birth
-        min_dob = params.get("min_dob")
-        max_dob = params.get("max_dob")
-        if min_dob:
-            records = records.filter(date_of_birth__year__gte=min_dob)
-        if max_dob:
-            records = records.filter(date_of_birth__year__lte=max_dob)
-
-        # filter voter score
-        voter_score = params.get("voter_score")
-        if voter_score:
-            records = records.filter(voter_score=voter_score)
-
-        # filter voter score
-        elections = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
-        for election in elections:
-            election_result = params.get(election)
-            if election_result:
-                if election_result == "on":
-                    election_result = True
-                records = records.filter(**{election: election_result})
-
-        return records
+    query_budget = 3
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        queryset = self.get_queryset()
+
         # get the search form
         search_form = VoterSearchForm(self.request.GET or None)
         context["search"] = search_form
 
-        # create a bar chart with distributions of the voters' birth date
-        birth_years = (
-            queryset.annotate(year=ExtractYear("date_of_birth"))
-            .values("year")
-            .annotate(count=Count("id"))
-            .order_by("year")
-        )
+        # the graphs only change with the search or a reload of the data
+        key = chart_cache_key("voter_graphs", get_data_version(), self.request.GET)
+        context.update(cached_charts(key, self.get_graphs))
+
+        return context
+
+    def get_graphs(self):
+        """Render the summary graphs for the current search as HTML divs"""
+        graphs = {}
+        if self.use_cube():
+            cube = get_cube()
+            summary = cube.summary(cube.mask(self.request.GET))
+        else:
+            summary = get_voter_summary(self.object_list)
+        n = summary["total"]
 
-        years = [item["year"] for item in birth_years]
-        counts = [item["count"] for item in birth_years]
+        # create a bar chart with distributions of the voters' birth date
+        years = list(summary["birth_years"].keys())
+        counts = list(summary["birth_years"].values())
 
         fig = go.Bar(x=years, y=counts, marker_color="lightblue")
 
-        graph_div_birth_date = plotly.offline.plot(
+        graph_div_birth_date = render_chart(
             {
                 "data": [fig],
-                "layout_title_text": f"Voter distribution by Year of Birth n = {len(queryset.all())}",
-            },
-            auto_open=False,
-            output_type="div",
+                "layout_title_text": f"Voter distribution by Year of Birth n = {n}",
+            }
         )
-        context["graph_div_birth_date"] = graph_div_birth_date
+        graphs["graph_div_birth_date"] = graph_div_birth_date
 
         # create a pie chart with distributions of the voters' party affiliation
-        party_affiliation = (
-            queryset.values("party_affiliation")
-            .annotate(count=Count("id"))
-            .order_by("party_affiliation")
-        )
-
-        party = [item["party_affiliation"] for item in party_affiliation]
-        counts = [item["count"] for item in party_affiliation]
+        party = list(summary["parties"].keys())
+        counts = list(summary["parties"].values())
 
         fig = go.Pie(labels=party, values=counts)
 
-        graph_div_party_affiliation = plotly.offline.plot(
+        graph_div_party_affiliation = render_chart(
             {
                 "data": [fig],
-                "layout_title_text": f"Voter distribution by Party Affiliation n = {len(queryset.all())}",
-            },
-            auto_open=False,
-            output_type="div",
+                "layout_title_text": f"Voter distribution by Party Affiliation n = {n}",
+            }
         )
-        context["graph_div_party_affiliation"] = graph_div_party_affiliation
+        graphs["graph_div_party_affiliation"] = graph_div_party_affiliation
 
         # create a bar chart with distributions of the voters' election record
-        elections = ["v20state", "v21town", "v21primary", "v22general", "v23town"]
-        counts = [len(queryset.filter(**{election: True})) for election in elections]
+        elections = list(summary["elections"].keys())
+        counts = list(summary["elections"].values())
 
         fig = go.Bar(x=elections, y=counts, marker_color="lightblue")
 
-        graph_div_elections = plotly.offline.plot(
+        graph_div_elections = render_chart(
             {
                 "data": [fig],
-                "layout_title_text": f"Voter distribution by Election n = {len(queryset.all())}",
-            },
-            auto_open=False,
-            output_type="div",
+                "layout_title_text": f"Voter distribution by Election n = {n}",
+            }
         )
-        context["graph_div_elections"] = graph_div_elections
+        graphs["graph_div_elections"] = graph_div_elections
 
-        return context
+        return graphs